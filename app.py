@@ -1,62 +1,79 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
+import functools
 import time
-from io import BytesIO
-
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False)
-    processed_data = output.getvalue()
-    return processed_data
-
-def AUTO_RKM(data):
-    required_cols = {'Instansi', 'Topik', 'Channel', 'Status'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"File Excel harus mengandung kolom: {required_cols}")
-
-    data_rkm = data[list(required_cols)]
-    data_selesai = data_rkm[data_rkm['Status'] == 'Selesai']
-
-    rkm = pd.DataFrame()
-    rkm['Instansi'] = data_selesai['Instansi'].unique()
-    rkm['Topik'] = rkm['Instansi'].apply(
-        lambda x: list(set(data_selesai[data_selesai['Instansi'] == x]['Topik']))
-    )
-    rkm['Topik'] = rkm['Topik'].apply(lambda x: ', '.join(x))
-    
-    rkm['Jumlah'] = rkm['Instansi'].apply(
-        lambda x: len(data_selesai[data_selesai['Instansi'] == x])
-    )
-    rkm['Ditindaklanjuti'] = rkm['Jumlah']
-    rkm['Belum Ditindaklanjuti'] = rkm['Jumlah'] - rkm['Ditindaklanjuti']
-
-    rkm = rkm[['Instansi', 'Jumlah', 'Ditindaklanjuti', 'Belum Ditindaklanjuti', 'Topik']]
-    rkm = rkm.sort_values(by='Jumlah', ascending=False).reset_index(drop=True)
-
-    kategori_keluhan = pd.DataFrame()
-    kategori_keluhan = data_selesai['Channel'].value_counts().reset_index()
-    kategori_keluhan.columns = ['Channel', 'Jumlah']
-
-    return rkm, kategori_keluhan
-
-def vis_kecamatan(data):
-    required_cols = {'Kecamatan','Status'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
-    
-    data_kategori = data[list(required_cols)]
-    rkm_kategori = pd.DataFrame()
-    selesai_kel = data_kategori[data_kategori['Status'] == 'Selesai']
-
-    rkm_kategori['Jumlah'] = selesai_kel['Kecamatan'].apply(
-        lambda x: len(selesai_kel[selesai_kel['Kecamatan'] == x])
-    )
-    rkm_kategori = selesai_kel['Kecamatan'].value_counts().reset_index()
-    rkm_kategori.columns = ['Kecamatan', 'Jumlah']
-
-    rkm_kategori = rkm_kategori.sort_values(by='Jumlah', ascending=False).head(5)
+from datetime import date
+
+from auto_rkm import (
+    IndeksFilter,
+    IndeksTopik,
+    Instrumentasi,
+    hash_gabungan,
+    hash_isi,
+    isi_upload,
+    proses_banyak_file,
+    rekap_cube,
+    validasi_kolom,
+)
+from auto_rkm.akumulasi import RekapKumulatif
+from auto_rkm.cache import CacheMemori
+from auto_rkm.ekspor import MIME_EKSPOR, ekspor
+from auto_rkm.indeks import DIMENSI_FILTER, KOLOM_INDEKS
+from auto_rkm.instrumentasi import laporan_memori, ringkasan_memori
+from auto_rkm.pembacaan import KOLOM_DIPAKAI
+from auto_rkm.pekerjaan import AntreanPekerjaan
+from auto_rkm.snapshot import EKSTENSI_SNAPSHOT, MIME_SNAPSHOT, Snapshot
+from auto_rkm.tabel import TabelGrafik
+
+# Satu cache untuk semua sesi dalam proses server: file yang sama yang dibuka
+# banyak pengguna cukup diparsing dan direkap sekali. Dibatasi total memori
+# (AUTO_RKM_BATAS_CACHE_MEMORI_MB) dengan eviksi LRU.
+@st.cache_resource
+def cache_bersama():
+    return CacheMemori()
+
+di_cache = cache_bersama().bungkus
+
+# st.fragment tersedia sejak Streamlit 1.37; pada versi lama seluruh halaman dijalankan ulang
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda fungsi: fungsi)
+rerun = getattr(st, 'rerun', None) or st.experimental_rerun
+# Jeda antar pemeriksaan status pekerjaan latar belakang (detik)
+JEDA_POLLING = 0.5
+
+def diukur(fungsi):
+    # Mencatat durasi dan memori fungsi grafik ke instrumentasi sesi
+    @functools.wraps(fungsi)
+    def pembungkus(*args, **kwargs):
+        instrumentasi = st.session_state.get('instrumentasi')
+        if instrumentasi is None:
+            return fungsi(*args, **kwargs)
+        with instrumentasi.ukur(fungsi.__name__):
+            return fungsi(*args, **kwargs)
+    return pembungkus
+
+def kolom_opsional(fungsi):
+    # Grafik yang kolomnya tidak ada cukup diberi peringatan di tempatnya. Grafik
+    # dijalankan di dalam fragment dashboard, dan rerun fragment tidak melewati
+    # try/except halaman utama sehingga ValueError harus ditangkap di sini.
+    @functools.wraps(fungsi)
+    def pembungkus(*args, **kwargs):
+        try:
+            return fungsi(*args, **kwargs)
+        except ValueError as ve:
+            st.warning(f"{ve}")
+    return pembungkus
+
+# Spec Vega-Lite disimpan per hash dataset, nama grafik dan parameternya sehingga
+# rerun tidak menghitung ulang tabel maupun membangun ulang chart Altair
+@di_cache
+def spec_tersimpan(file_hash, nama, parameter, _buat):
+    return _buat()
+
+def tampilkan_grafik(spec):
+    st.vega_lite_chart(spec, use_container_width=True)
+
+def spec_kecamatan(grafik):
+    rkm_kategori = grafik.lokasi('Kecamatan')
 
     # Grafik batang
     bars_kecamatan = alt.Chart(rkm_kategori).mark_bar(
@@ -97,24 +114,15 @@ def vis_kecamatan(data):
         labelLimit=0,
         labelAngle=45 
     )
-    st.altair_chart(chart_kecamatan, use_container_width=True)
+    return chart_kecamatan.to_dict()
 
-def vis_kelurahan(data):
-    required_cols = {'Kelurahan','Status'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
-    
-    data_kelurahan = data[list(required_cols)]
-    rkm_kelurahan = pd.DataFrame()
-    selesai_kel = data_kelurahan[data_kelurahan['Status'] == 'Selesai']
+@kolom_opsional
+@diukur
+def vis_kecamatan(file_hash, grafik):
+    tampilkan_grafik(spec_tersimpan(file_hash, 'vis_kecamatan', (), lambda: spec_kecamatan(grafik)))
 
-    rkm_kelurahan['Jumlah'] = selesai_kel['Kelurahan'].apply(
-        lambda x: len(selesai_kel[selesai_kel['Kelurahan'] == x])
-    )
-    rkm_kelurahan = selesai_kel['Kelurahan'].value_counts().reset_index()
-    rkm_kelurahan.columns = ['Kelurahan', 'Jumlah']
-
-    rkm_kelurahan = rkm_kelurahan.sort_values(by='Jumlah', ascending=False).head(5)
+def spec_kelurahan(grafik):
+    rkm_kelurahan = grafik.lokasi('Kelurahan')
 
     # Grafik batang
     bars_kelurahan = alt.Chart(rkm_kelurahan).mark_bar(
@@ -155,19 +163,16 @@ def vis_kelurahan(data):
         labelLimit=0,
         labelAngle=45 
     )
-    st.altair_chart(chart_kelurahan, use_container_width=True)
+    return chart_kelurahan.to_dict()
 
+@kolom_opsional
+@diukur
+def vis_kelurahan(file_hash, grafik):
+    tampilkan_grafik(spec_tersimpan(file_hash, 'vis_kelurahan', (), lambda: spec_kelurahan(grafik)))
 
-def persen_kategori(data):
-    required_cols = {'Kategori', 'Status'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
 
-    selesai = data[data['Status'] == 'Selesai'].copy()
-    df = selesai['Kategori'].value_counts().reset_index()
-    df.columns = ['Kategori', 'Jumlah']
-    df['Persentase'] = (df['Jumlah'] / df['Jumlah'].sum()) * 100
-    df['PersenLabel'] = df['Persentase'].map(lambda x: f"{x:.1f}%")
+def spec_kategori(grafik):
+    df = grafik.kategori()
 
     pie = alt.Chart(df).mark_arc(innerRadius=50).encode(
         theta=alt.Theta(field="Jumlah", type="quantitative"),
@@ -179,88 +184,91 @@ def persen_kategori(data):
     )
 
     table = df[['Kategori', 'Jumlah', 'PersenLabel']].rename(columns={'PersenLabel': 'Persentase'})
+    return pie.to_dict(), table
+
+@kolom_opsional
+@diukur
+def persen_kategori(file_hash, grafik):
+    spec, table = spec_tersimpan(file_hash, 'persen_kategori', (), lambda: spec_kategori(grafik))
 
     # Tampilkan di Streamlit sebagai dua kolom
     col1, col2 = st.columns([1, 1])
     with col1:
-        st.altair_chart(pie, use_container_width=True)
+        tampilkan_grafik(spec)
     with col2:
         st.dataframe(table, use_container_width=True)
 
-def tren_keluhan(data):
-    required_cols = {'Tanggal Keluhan','Status','Kategori'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
-    
-    data_tren = data[list(required_cols)]
-    rkm_tren = pd.DataFrame()
-    selesai_tren = data_tren[data_tren['Status'] == 'Selesai']
-    selesai_tren = data_tren[data_tren['Kategori'] == 'Keluhan']
+LABEL_GRANULARITAS = {'hari': 'Harian', 'minggu': 'Mingguan', 'bulan': 'Bulanan'}
 
-    rkm_tren['Jumlah'] = selesai_tren['Tanggal Keluhan'].apply(
-        lambda x: len(selesai_tren[selesai_tren['Tanggal Keluhan'] == x])
+def pilihan_tren(key):
+    col1, col2 = st.columns(2)
+    with col1:
+        granularitas = st.selectbox(
+            "Periode:", list(LABEL_GRANULARITAS), format_func=LABEL_GRANULARITAS.get, key=f'periode_{key}'
+        )
+    with col2:
+        rata_bergerak = st.number_input(
+            "Rata-rata bergerak (jumlah periode, 0 = tanpa):", min_value=0, max_value=90, value=0, key=f'rata_{key}'
+        )
+    return granularitas, rata_bergerak
+
+def spec_tren(tren):
+    dasar = alt.Chart(tren).encode(x=alt.X('Tanggal Keluhan:T', title=None))
+    tooltip = ['Tanggal Keluhan:T', 'Jumlah']
+    if 'Rata-rata' in tren.columns:
+        tooltip.append(alt.Tooltip('Rata-rata:Q', format='.1f'))
+    chart = dasar.mark_line(point=True).encode(
+        y=alt.Y('Jumlah:Q', title=None),
+        tooltip=tooltip
     )
-    selesai_tren['Tanggal Keluhan'] = selesai_tren['Tanggal Keluhan'].dt.date
-    rkm_tren = selesai_tren['Tanggal Keluhan'].value_counts().reset_index()
-    rkm_tren.columns = ['Tanggal Keluhan', 'Jumlah']
+    if 'Rata-rata' in tren.columns:
+        chart += dasar.mark_line(color='orange', strokeDash=[4, 2]).encode(y='Rata-rata:Q')
 
-    tren_chart = alt.Chart(rkm_tren).mark_line(point=True).encode(
-        x=alt.X('Tanggal Keluhan:T', title=None),
-        y=alt.Y('Jumlah:Q', title=None),
-        tooltip=['Tanggal Keluhan:T', 'Jumlah']
-    ).properties(
+    # Granularitas yang benar-benar dipakai ikut disimpan di usermeta spec
+    chart = chart.properties(
         width=700,
-        height=400
+        height=400,
+        usermeta={'granularitas': tren.attrs.get('granularitas'), 'rata_bergerak': tren.attrs.get('rata_bergerak')}
     ).configure_axisX(
         labelLimit=0,
         labelAngle=90
     )
-    st.altair_chart(tren_chart, use_container_width=True)
-
-def tren_permohonan_info(data):
-    required_cols = {'Tanggal Keluhan','Status','Kategori'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
-    
-    data_tren_info = data[list(required_cols)]
-    rkm_tren_info = pd.DataFrame()
-    selesai_tren_info = data_tren_info[data_tren_info['Status'] == 'Selesai']
-    selesai_tren_info = data_tren_info[data_tren_info['Kategori'] == 'Permohonan Informasi']
-
-    rkm_tren_info['Jumlah'] = selesai_tren_info['Tanggal Keluhan'].apply(
-        lambda x: len(selesai_tren_info[selesai_tren_info['Tanggal Keluhan'] == x])
+    return chart.to_dict()
+
+def grafik_tren(spec, granularitas, rata_bergerak):
+    # Rentang harian yang terlalu panjang diturunkan otomatis oleh tabel_tren,
+    # begitu juga jendela rata-rata bergerak yang diisi dalam hari
+    dipakai = spec['usermeta']['granularitas'] or granularitas
+    if dipakai != granularitas:
+        keterangan = f"Ditampilkan per {dipakai} agar grafik tetap ringan."
+        rata_dipakai = spec['usermeta'].get('rata_bergerak') or 0
+        if rata_bergerak > 1 and rata_dipakai > 1:
+            keterangan += f" Rata-rata bergerak {rata_bergerak} hari dihitung sebagai {rata_dipakai} {dipakai}."
+        elif rata_bergerak > 1:
+            keterangan += f" Rata-rata bergerak {rata_bergerak} hari tidak ditampilkan karena setiap titik sudah mencakup satu {dipakai}."
+        st.caption(keterangan)
+    tampilkan_grafik(spec)
+
+@kolom_opsional
+@diukur
+def tren_keluhan(file_hash, grafik, granularitas='hari', rata_bergerak=0):
+    spec = spec_tersimpan(
+        file_hash, 'tren_keluhan', (granularitas, rata_bergerak),
+        lambda: spec_tren(grafik.tren('Keluhan', granularitas, rata_bergerak))
     )
-    selesai_tren_info['Tanggal Keluhan'] = selesai_tren_info['Tanggal Keluhan'].dt.date
-    rkm_tren_info = selesai_tren_info['Tanggal Keluhan'].value_counts().reset_index()
-    rkm_tren_info.columns = ['Tanggal Keluhan', 'Jumlah']
-
-    trenInfo_chart = alt.Chart(rkm_tren_info).mark_line(point=True).encode(
-        x=alt.X('Tanggal Keluhan:T', title=None),
-        y=alt.Y('Jumlah:Q', title=None),
-        tooltip=['Tanggal Keluhan:T', 'Jumlah']
-    ).properties(
-        width=700,
-        height=400
-    ).configure_axisX(
-        labelLimit=0,
-        labelAngle=90
+    grafik_tren(spec, granularitas, rata_bergerak)
+
+@kolom_opsional
+@diukur
+def tren_permohonan_info(file_hash, grafik, granularitas='hari', rata_bergerak=0):
+    spec = spec_tersimpan(
+        file_hash, 'tren_permohonan_info', (granularitas, rata_bergerak),
+        lambda: spec_tren(grafik.tren('Permohonan Informasi', granularitas, rata_bergerak))
     )
+    grafik_tren(spec, granularitas, rata_bergerak)
 
-    st.altair_chart(trenInfo_chart, use_container_width=True)
-    
-def opd_vis(data):
-    required_cols = {'Kategori','Status','Instansi'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
-    
-    opd_keluhan = data[list(required_cols)]
-    selesai_opd = opd_keluhan[
-        (opd_keluhan['Status'] == 'Selesai') &
-        (opd_keluhan['Kategori'] == 'Keluhan') &
-        (opd_keluhan['Instansi'].str.startswith('Dinas'))
-    ]
-    top5 = selesai_opd['Instansi'].value_counts().reset_index().head(5)
-    top5.columns = ['Instansi', 'Jumlah']
+def spec_top_opd(indeks, kategori):
+    top5 = indeks.daftar_instansi(kategori, top_n=5)
 
     bars = alt.Chart(top5).mark_bar(
         cornerRadiusBottomRight=4,
@@ -299,96 +307,31 @@ def opd_vis(data):
     ).configure_axisY(
         labelLimit=0
     )
-
-    st.altair_chart(chart, use_container_width=True)
-
-def opdInfo_vis(data):
-    required_cols = {'Kategori','Status','Instansi'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
-    
-    opd_info = data[list(required_cols)]
-    selesai_opdInfo = opd_info[
-        (opd_info['Status'] == 'Selesai') &
-        (opd_info['Kategori'] == 'Permohonan Informasi') &
-        (opd_info['Instansi'].str.startswith('Dinas'))
-    ]
-    top5 = selesai_opdInfo['Instansi'].value_counts().reset_index().head(5)
-    top5.columns = ['Instansi', 'Jumlah']
-
-    bars = alt.Chart(top5).mark_bar(
-        cornerRadiusBottomRight=4,
-        cornerRadiusTopRight=4
-    ).encode(
-        x=alt.X('Jumlah:Q',title=None),
-        y=alt.Y('Instansi:N',title=None,sort='-x'),
-        color=alt.Color('Instansi:N', legend=None, scale=alt.Scale(scheme='category10')),
-        tooltip=['Instansi', 'Jumlah']
-    )
-
-    # Tambahkan label jumlah
-    text = alt.Chart(top5).mark_text(
-        align='left',
-        baseline='middle',
-        dx=3,
-        fontSize=11,
-        color='white'
-    ).encode(
-        x='Jumlah:Q',
-        y=alt.Y('Instansi:N', sort='-x'),
-        text='Jumlah:Q'
-    )
-
-    # Gabungkan dan tampilkan
-    chart = (bars + text).properties(
-        width=700,
-        height=400,
-    ).configure_axis(
-        labelFontSize=12,
-        titleFontSize=14
-    ).configure_title(
-        fontSize=16,
-        anchor='start',
-        color='gray'
-    ).configure_axisY(
-        labelLimit=0
+    return chart.to_dict()
+
+@kolom_opsional
+@diukur
+def opd_vis(file_hash, indeks):
+    tampilkan_grafik(spec_tersimpan(file_hash, 'opd_vis', (), lambda: spec_top_opd(indeks, 'Keluhan')))
+
+@kolom_opsional
+@diukur
+def opdInfo_vis(file_hash, indeks):
+    tampilkan_grafik(
+        spec_tersimpan(file_hash, 'opdInfo_vis', (), lambda: spec_top_opd(indeks, 'Permohonan Informasi'))
     )
-
-    st.altair_chart(chart, use_container_width=True)
-    
-def top5Opd_keluhan_vis(data):
-    required_cols = {'Kategori', 'Status', 'Instansi', 'Topik'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
-
-    filtered = data[
-        (data['Status'] == 'Selesai') &
-        (data['Kategori'] == 'Keluhan') &
-        (data['Instansi'].str.startswith('Dinas'))
-    ]
-
-    top_5_instansi = filtered['Instansi'].value_counts().reset_index().head(5)
-    top_5_instansi.columns = ['Instansi', 'Jumlah'] 
-
-    if top_5_instansi.empty:
-        st.warning("Tidak ada data yang memenuhi syarat untuk divisualisasikan.")
-        return
-
     
-    instansi_terpilih = st.selectbox("Pilih Instansi:", top_5_instansi['Instansi'])
-
-    data_instansi = filtered[filtered['Instansi'] == instansi_terpilih]
-    topik_count = data_instansi['Topik'].value_counts().reset_index()
-    topik_count.columns = ['Topik', 'Jumlah']
+def spec_topik_opd(indeks, kategori, instansi, skema):
+    topik_count = indeks.topik_instansi(kategori, instansi)
 
     bar = alt.Chart(topik_count).mark_bar().encode(
         x=alt.X('Jumlah:Q', title=None),
         y=alt.Y('Topik:N', sort='-x', title=None),
-        color=alt.Color('Jumlah:Q', scale=alt.Scale(scheme='greenblue'), legend=None)
+        color=alt.Color('Jumlah:Q', scale=alt.Scale(scheme=skema), legend=None)
     ).properties(
         width=600,
         height=300,
-        title=f'Topik Keluhan - {instansi_terpilih}'
+        title=f'Topik {kategori} - {instansi}'
     )
     text = bar.mark_text(
         align='left',
@@ -403,188 +346,520 @@ def top5Opd_keluhan_vis(data):
     chart= (bar+text).configure_axisY(
         labelLimit=200
     )
-    st.altair_chart(chart, use_container_width=True)
+    return chart.to_dict()
 
-def top5Opd_permohonanInfo_vis(data):
-    required_cols = {'Kategori', 'Status', 'Instansi', 'Topik'}
-    if not required_cols.issubset(data.columns):
-        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
+# Mengganti instansi hanya menjalankan ulang grafik ini
+@fragment
+@kolom_opsional
+@diukur
+def top5Opd_keluhan_vis(file_hash, indeks):
+    # Semua OPD urut jumlah terbanyak; 5 teratas berada di awal pilihan
+    daftar_instansi = indeks.daftar_instansi('Keluhan')
 
-    filtered = data[
-        (data['Status'] == 'Selesai') &
-        (data['Kategori'] == 'Permohonan Informasi') &
-        (data['Instansi'].str.startswith('Dinas'))
-    ]
+    if daftar_instansi.empty:
+        st.warning("Tidak ada data yang memenuhi syarat untuk divisualisasikan.")
+        return
+
+    
+    instansi_terpilih = st.selectbox("Pilih Instansi:", daftar_instansi['Instansi'])
+
+    spec = spec_tersimpan(
+        file_hash, 'topik_opd', ('Keluhan', instansi_terpilih),
+        lambda: spec_topik_opd(indeks, 'Keluhan', instansi_terpilih, 'greenblue')
+    )
+    tampilkan_grafik(spec)
 
-    top_5_instansi = filtered['Instansi'].value_counts().reset_index().head(5)
-    top_5_instansi.columns = ['Instansi', 'Jumlah'] 
+@fragment
+@kolom_opsional
+@diukur
+def top5Opd_permohonanInfo_vis(file_hash, indeks):
+    # Semua OPD urut jumlah terbanyak; 5 teratas berada di awal pilihan
+    daftar_instansi = indeks.daftar_instansi('Permohonan Informasi')
 
-    if top_5_instansi.empty:
+    if daftar_instansi.empty:
         st.warning("Tidak ada data yang memenuhi syarat untuk divisualisasikan.")
         return
 
     
-    instansi_terpilih = st.selectbox("Pilih Instansi:", top_5_instansi['Instansi'])
-
-    data_instansi = filtered[filtered['Instansi'] == instansi_terpilih]
-    topik_count = data_instansi['Topik'].value_counts().reset_index()
-    topik_count.columns = ['Topik', 'Jumlah']
+    instansi_terpilih = st.selectbox("Pilih Instansi:", daftar_instansi['Instansi'])
 
-    bar = alt.Chart(topik_count).mark_bar().encode(
-        x=alt.X('Jumlah:Q', title=None),
-        y=alt.Y('Topik:N', sort='-x', title=None, ),
-        color=alt.Color('Jumlah:Q', scale=alt.Scale(scheme='yellowgreen'), legend=None)
-    ).properties(
-        width=600,
-        height=300,
-        title=f'Topik Permohonan Informasi - {instansi_terpilih}'
+    spec = spec_tersimpan(
+        file_hash, 'topik_opd', ('Permohonan Informasi', instansi_terpilih),
+        lambda: spec_topik_opd(indeks, 'Permohonan Informasi', instansi_terpilih, 'yellowgreen')
     )
-    text = bar.mark_text(
-        align='left',
-        baseline='middle',
-        dx=5,
+    tampilkan_grafik(spec)
+def spec_channel(kategori):
+    # Grafik batang
+    kategori = kategori.sort_values(by='Jumlah', ascending=False)
+    bars = alt.Chart(kategori).mark_bar(
+        cornerRadiusTopLeft=5,
+        cornerRadiusTopRight=5
+    ).encode(
+        x=alt.X('Channel:N', sort='-y', title=None),
+        y=alt.Y('Jumlah:Q', title=None),
+        color=alt.Color('Channel:N', legend=None, scale=alt.Scale(scheme='category10')),
+        tooltip=['Channel', 'Jumlah']
+    )
+
+    # jumlah kategori
+    text = alt.Chart(kategori).mark_text(
+        align='center',
+        baseline='bottom',
+        dy=-5,
+        fontSize=12,
         color='white'
     ).encode(
-        x=alt.X('Jumlah:Q'),
-        y=alt.Y('Topik:N', sort='-x'),
+        x=alt.X('Channel:N', sort='-y'),
+        y='Jumlah:Q',
         text='Jumlah:Q'
     )
-    chart= (bar+text).configure_axisY(
-        labelLimit=200
+
+    chart = (bars + text).properties(
+        width=600,
+        height=400,
+    ).configure_axis(
+        labelFontSize=12,
+        titleFontSize=18
+    ).configure_title(
+        fontSize=18,
+        anchor='start',
+        color='gray'
+    ).configure_axisX(
+        labelLimit=0 
     )
-    st.altair_chart(chart, use_container_width=True)
+    return chart.to_dict()
+
+@kolom_opsional
+@diukur
+def vis_channel(file_hash, kategori):
+    tampilkan_grafik(spec_tersimpan(file_hash, 'vis_channel', (), lambda: spec_channel(kategori)))
+
+def hash_upload(uploaded_files):
+    # Hash setiap file disimpan per file_id: selama pekerjaan berjalan halaman
+    # dijalankan ulang setiap JEDA_POLLING, dan isi upload tidak perlu dibaca serta
+    # di-hash ulang setiap kali. Hanya file yang masih diupload yang disimpan.
+    tersimpan = st.session_state.get('hash_file', {})
+    hash_file = {}
+    daftar_hash = []
+    for f in uploaded_files:
+        file_id = getattr(f, 'file_id', None)
+        isi_hash = tersimpan.get(file_id) if file_id is not None else None
+        if isi_hash is None:
+            isi_hash = hash_isi(f.getvalue())
+        if file_id is not None:
+            hash_file[file_id] = isi_hash
+        daftar_hash.append(isi_hash)
+    st.session_state['hash_file'] = hash_file
+    return hash_gabungan(daftar_hash)
+
+def isi_uploads(uploaded_files):
+    # Isi file hanya disalin saat benar-benar diproses, bukan setiap polling
+    return [(f.name, f.getvalue()) for f in uploaded_files]
+
+# Hasil olahan disimpan berdasarkan hash isi file sehingga rerun akibat widget
+# tidak membaca ulang Excel. Argumen berawalan _ tidak ikut menjadi kunci cache.
+@di_cache
+def muat_upload(file_hash, _uploads):
+    daftar_isi = [isi for nama, isi in _uploads for isi in isi_upload(nama, isi)]
+    return proses_banyak_file(daftar_isi)
+
+# Mode kumulatif: baris baru ditambahkan ke state di disk sekali per upload, tidak
+# setiap rerun. Hash dataset diganti versi state agar cache rekap tidak tertukar.
+def tambah_kumulatif(file_hash, uploaded_files, instrumentasi):
+    hasil = st.session_state.get('kumulatif')
+    if hasil is None or hasil[0] != file_hash:
+        # Lock folder state: sesi lain yang menambahkan upload bersamaan menunggu giliran.
+        # Hanya diukur di sini: rerun polling yang memakai hasil tersimpan tidak
+        # menambah baris ke tabel tahap.
+        with instrumentasi.ukur('akumulasi'), RekapKumulatif.dibuka() as state:
+            uploads = isi_uploads(uploaded_files)
+            baru = state.tambah_upload([isi for nama, isi in uploads for isi in isi_upload(nama, isi)])
+            state.simpan()
+        if state.cube is None:
+            raise ValueError("Tidak ada baris yang dapat ditambahkan ke rekap kumulatif.")
+        hasil = (file_hash, state.versi, state.cube, baru, state.jumlah_baris)
+        st.session_state['kumulatif'] = hasil
+    return hasil[1:]
+
+@di_cache
+def rekap_upload(file_hash, _cube):
+    return rekap_cube(_cube)
+
+@di_cache
+def indeks_topik(file_hash, _cube):
+    # Indeks hanya dipakai grafik; file yang hanya berisi kolom wajib tetap
+    # direkap dan dashboard grafiknya dilewati
+    if not KOLOM_INDEKS.issubset(_cube.columns):
+        return None
+    return IndeksTopik.dari_cube(_cube)
+
+# Indeks panel filter dibangun sekali per dataset; setiap perubahan filter hanya
+# menggabungkan mask dari indeks ini
+@di_cache
+def indeks_filter(file_hash, _cube):
+    return IndeksFilter.dari_cube(_cube)
+
+def panel_filter(indeks):
+    # Mengembalikan (rentang tanggal, {dimensi: nilai}); filter yang tidak
+    # membatasi apa pun dikembalikan sebagai None/kosong
+    with st.sidebar:
+        st.subheader("Filter data")
+        tanggal = None
+        rentang = indeks.rentang_tanggal()
+        if rentang is not None:
+            pilihan_tanggal = st.date_input(
+                "Rentang tanggal:", value=rentang, min_value=rentang[0], max_value=rentang[1]
+            )
+            # Selama tanggal akhir belum dipilih, date_input hanya berisi satu tanggal
+            if isinstance(pilihan_tanggal, (tuple, list)) and len(pilihan_tanggal) == 2:
+                if tuple(pilihan_tanggal) != rentang:
+                    tanggal = tuple(pilihan_tanggal)
+
+        nilai = {}
+        for dim in DIMENSI_FILTER:
+            pilihan = indeks.pilihan(dim)
+            if pilihan:
+                dipilih = st.multiselect(f"{dim}:", pilihan, help="Kosongkan untuk menampilkan semua.")
+                if dipilih:
+                    nilai[dim] = tuple(dipilih)
+    return tanggal, nilai
+
+# File unduhan baru dibuat saat diminta, lalu disimpan per hash dataset dan format
+@di_cache
+def file_unduhan(file_hash, format, sertakan_grafik, _grafik, _rkm, _kategori):
+    tabel = {'Hasil RKM': _rkm, 'Kategori Keluhan': _kategori}
+    if sertakan_grafik:
+        tabel.update(_grafik.semua())
+    return ekspor(tabel, format)
+
+# Snapshot laporan: hanya hasil agregasi, dapat dibuka kembali tanpa file Excel asli
+@di_cache
+def file_snapshot(file_hash, _cube, _rkm, _kategori, _indeks):
+    return Snapshot.dari_cube(_cube, _rkm, _kategori, _indeks, label=file_hash).ke_bytes()
+
+@di_cache
+def muat_snapshot(file_hash, _isi_file):
+    return Snapshot.dari_bytes(_isi_file)
+
+def instrumentasi_sesi(file_hash):
+    instrumentasi = st.session_state.get('instrumentasi')
+    if instrumentasi is None or instrumentasi.label != file_hash:
+        instrumentasi = Instrumentasi(label=file_hash)
+        st.session_state['instrumentasi'] = instrumentasi
+    return instrumentasi
+
+def panel_debug(instrumentasi, dataset):
+    with st.sidebar:
+        st.subheader("Waktu proses per tahap")
+        st.dataframe(instrumentasi.tabel(), use_container_width=True)
+        st.download_button(
+            label="Download log tahap (.json)",
+            data=instrumentasi.ke_json(),
+            file_name='log_tahap.json',
+            mime='application/json'
+        )
+
+        # Memori dataset yang dipegang sesi ini (ikut tersimpan di cache upload)
+        st.subheader("Memori dataset")
+        ringkasan = ringkasan_memori(dataset)
+        st.dataframe(ringkasan, use_container_width=True)
+        st.caption(f"Total {ringkasan['mb'].sum():.2f} MB untuk dataset ini.")
+        if 'cube' in dataset:
+            with st.expander("Rincian kolom cube"):
+                st.dataframe(laporan_memori(dataset['cube']), use_container_width=True)
+
+        st.subheader("Cache bersama (semua sesi)")
+        st.dataframe([cache_bersama().statistik()], use_container_width=True)
+
+LABEL_TAHAP = {
+    'parse': 'Membaca file...',
+    'validasi': 'Memeriksa kolom...',
+    'AUTO_RKM': 'Menyusun rekap (AUTO_RKM)...',
+    'indeks': 'Menyiapkan indeks drill-down...',
+}
+
+@st.cache_resource
+def antrean_pekerjaan():
+    return AntreanPekerjaan()
+
+def tahap_pemrosesan(file_hash, uploads, cube=None):
+    # Hasil setiap tahap juga tersimpan di cache bersama, sehingga pekerjaan
+    # untuk file yang sudah pernah diproses selesai seketika
+    return [
+        ('parse', lambda hasil: muat_upload(file_hash, uploads) if cube is None else cube),
+        ('validasi', lambda hasil: validasi_kolom(hasil['parse'].columns)),
+        ('AUTO_RKM', lambda hasil: rekap_upload(file_hash, hasil['parse'])),
+        ('indeks', lambda hasil: indeks_topik(file_hash, hasil['parse'])),
+    ]
+
+def pekerjaan_sesi(file_hash, buat_tahap, instrumentasi):
+    # Satu pekerjaan per sesi; upload baru membatalkan pekerjaan lama yang belum selesai
+    pekerjaan = st.session_state.get('pekerjaan')
+    if pekerjaan is not None and pekerjaan.label != file_hash:
+        pekerjaan.batal()
+        pekerjaan = None
+    if pekerjaan is None:
+        pekerjaan = antrean_pekerjaan().kirim(file_hash, buat_tahap(), instrumentasi)
+        st.session_state['pekerjaan'] = pekerjaan
+    return pekerjaan
+
+LABEL_FORMAT = {'xlsx': 'Excel (.xlsx)', 'csv': 'CSV (.zip)', 'parquet': 'Parquet (.zip)'}
+
+@fragment
+def unduhan(file_hash, grafik, rkm, kategori):
+    col1, col2 = st.columns(2)
+    with col1:
+        format = st.selectbox("Format unduhan:", list(MIME_EKSPOR), format_func=LABEL_FORMAT.get)
+    with col2:
+        sertakan_grafik = st.checkbox("Sertakan tabel grafik")
+
+    permintaan = (file_hash, format, sertakan_grafik)
+    if st.button("Siapkan file unduhan"):
+        st.session_state['unduhan'] = permintaan
+
+    if st.session_state.get('unduhan') == permintaan:
+        with st.spinner('Menyiapkan file...'), st.session_state['instrumentasi'].ukur(f'ekspor_{format}'):
+            data = file_unduhan(file_hash, format, sertakan_grafik, grafik, rkm, kategori)
+        st.download_button(
+            label=f"Download Hasil RKM ({LABEL_FORMAT[format]})",
+            data=data,
+            file_name='hasil_rkm.xlsx' if format == 'xlsx' else f'hasil_rkm_{format}.zip',
+            mime=MIME_EKSPOR[format]
+        )
+
+@fragment
+def unduhan_snapshot(file_hash, cube, rkm, kategori, indeks):
+    # Snapshot mengikuti filter yang sedang aktif
+    if st.button("Siapkan snapshot laporan"):
+        st.session_state['snapshot'] = file_hash
+
+    if st.session_state.get('snapshot') == file_hash:
+        with st.spinner('Menyiapkan snapshot...'), st.session_state['instrumentasi'].ukur('snapshot'):
+            data = file_snapshot(file_hash, cube, rkm, kategori, indeks)
+        st.download_button(
+            label=f"Download snapshot laporan (.{EKSTENSI_SNAPSHOT})",
+            data=data,
+            file_name=f'snapshot_rkm_{date.today():%Y%m%d}.{EKSTENSI_SNAPSHOT}',
+            mime=MIME_SNAPSHOT
+        )
+
+def bagian_media(file_hash, grafik, kategori, indeks):
+    st.subheader("Jumlah Keluhan Masyarakat berdasarkan Media")
+    vis_channel(file_hash, kategori)
+
+def bagian_lokasi(file_hash, grafik, kategori, indeks):
+    #Visualisasi Kecamatan
+    st.subheader("5 Kecamatan dengan Keluhan Masyarakat Terbanyak")
+    vis_kecamatan(file_hash, grafik)
+
+    #Visualisasi Kelurahan
+    st.subheader("5 Kelurahan dengan Keluhan Masyarakat Terbanyak")
+    vis_kelurahan(file_hash, grafik)
+
+def bagian_kategori(file_hash, grafik, kategori, indeks):
+    st.subheader("Persentase Jenis Kategori")
+    persen_kategori(file_hash, grafik)
+
+def bagian_keluhan(file_hash, grafik, kategori, indeks):
+    #Visualisasi tren harian keluhan
+    st.subheader("Jumlah Keluhan per Periode")
+    tren_keluhan(file_hash, grafik, *pilihan_tren('keluhan'))
+
+    # Visualisasi OPD Keluhan terbanyak
+    st.subheader('5 OPD Teratas yang Mendapatkan Keluhan')
+    opd_vis(file_hash, indeks)
+
+    # Visualisasi tiap opd yang mendapatkan keluhan terbanyak
+    st.subheader('Keluhan terhadap OPD')
+    top5Opd_keluhan_vis(file_hash, indeks)
+
+def bagian_permohonan_info(file_hash, grafik, kategori, indeks):
+    #visualisasi tren permohonan informasi
+    st.subheader('Jumlah Permohonan Informasi per Periode')
+    tren_permohonan_info(file_hash, grafik, *pilihan_tren('permohonan_info'))
+
+    # Visualisasi OPD Permohonan Info terbanyak
+    st.subheader('5 OPD Teratas yang Mendapatkan Permohonan Informasi')
+    opdInfo_vis(file_hash, indeks)
+
+    # Visualisasi tiap opd yang mendapatkan permohonan Informasi terbanyak
+    st.subheader('Permohonan Informasi terhadap OPD')
+    top5Opd_permohonanInfo_vis(file_hash, indeks)
+
+BAGIAN_DASHBOARD = {
+    'Media': bagian_media,
+    'Lokasi': bagian_lokasi,
+    'Kategori': bagian_kategori,
+    'Keluhan': bagian_keluhan,
+    'Permohonan Informasi': bagian_permohonan_info,
+}
+
+# Hanya bagian yang dipilih yang dihitung dan digambar. Mengganti bagian cukup
+# menjalankan ulang fragment ini, bukan tabel rekap dan tombol unduhan di atasnya.
+@fragment
+def dashboard(file_hash, grafik, kategori, indeks):
+    bagian = st.radio("Tampilkan:", list(BAGIAN_DASHBOARD), horizontal=True)
+    BAGIAN_DASHBOARD[bagian](file_hash, grafik, kategori, indeks)
+
+def tampilkan_snapshot(berkas, debug=False):
+    # Dashboard lengkap dari snapshot: tidak ada parse, rekap maupun indeks yang dihitung ulang
+    isi_file = berkas.getvalue()
+    file_hash = hash_isi(isi_file)
+    instrumentasi = instrumentasi_sesi(file_hash)
+    with instrumentasi.ukur('muat_snapshot'):
+        snapshot = muat_snapshot(file_hash, isi_file)
+
+    meta = snapshot.meta
+    keterangan = f"Menampilkan snapshot yang dibuat {meta.get('dibuat', '-')}"
+    if meta.get('tanggal_awal'):
+        keterangan += f" (data {meta['tanggal_awal']} s.d. {meta['tanggal_akhir']})"
+    st.info(f"{keterangan}. Hapus snapshot di sidebar untuk memproses file Excel.")
+
+    st.header("Hasil RKM")
+    st.dataframe(snapshot.rkm)
+
+    st.header("Jumlah Keluhan berdasarkan Kategori")
+    st.dataframe(snapshot.kategori)
+
+    unduhan(file_hash, snapshot.grafik, snapshot.rkm, snapshot.kategori)
+
+    # Snapshot dari file yang hanya berisi kolom wajib tidak memiliki data grafik
+    if snapshot.grafik.tabel or snapshot.indeks.ada_data:
+        st.header("Beberapa Visualisasi Data")
+        dashboard(file_hash, snapshot.grafik, snapshot.kategori, snapshot.indeks)
+
+    if debug:
+        panel_debug(instrumentasi, {'rkm': snapshot.rkm, 'kategori': snapshot.kategori, 'indeks': snapshot.indeks})
+
 #--------APP
 st.title("AUTO-RKM")
 st.markdown("""
 **Pastikan file memenuhi kriteria berikut:**
-- 📄 Format file: `.xlsx`
+- 📄 Format file: `.xlsx` (boleh lebih dari satu file) atau `.zip` berisi file `.xlsx`
 - 📊 Kolom wajib: `Instansi`, `Topik`, `Channel`, `Status`
+- 💾 Laporan yang pernah disimpan sebagai snapshot (`.rkm`) dapat dibuka dari sidebar
 """)
 
-uploaded_file = st.file_uploader("Upload file Excel (.xlsx)", type=["xlsx"])
-
-if uploaded_file is not None:
+debug = st.sidebar.checkbox("Tampilkan waktu proses (debug)")
+kumulatif = st.sidebar.checkbox(
+    "Tambahkan ke rekap kumulatif",
+    help="Baris baru digabung ke rekap tersimpan; baris dengan No Tiket yang sudah pernah diupload dilewati, kecuali isinya berubah (misalnya status menjadi Selesai)."
+)
+
+snapshot_file = st.sidebar.file_uploader(
+    f"Buka snapshot laporan (.{EKSTENSI_SNAPSHOT})",
+    type=[EKSTENSI_SNAPSHOT],
+    help="Menampilkan dashboard yang pernah disimpan tanpa file Excel asli."
+)
+
+uploaded_files = st.file_uploader(
+    "Upload file Excel (.xlsx) atau .zip",
+    type=["xlsx", "zip"],
+    accept_multiple_files=True
+)
+
+if snapshot_file is not None:
     try:
-        data = pd.read_excel(uploaded_file)
-        rkm, kategori = AUTO_RKM(data)
-
-        # Progres bar
-        with st.spinner('Sedang memproses...'):
-        # Simulasi proses berat
-            time.sleep(2)
-
-        st.success('Proses selesai!')
-
-        st.header("Hasil RKM")
-        st.dataframe(rkm)
-
-        st.header("Jumlah Keluhan berdasarkan Kategori")
-        st.dataframe(kategori)
-
-        col1, col2 = st.columns(2)
-        # Tombol download untuk hasil rkm
-        with col1:
-            excel_rkm = to_excel(rkm)
-            st.download_button(
-                label="Download Hasil RKM (.xlsx)",
-                data=excel_rkm,
-                file_name='hasil_rkm.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-
-        # Tombol download untuk kategori keluhan
-        with col2:
-            excel_kategori = to_excel(kategori)
-            st.download_button(
-                label="Download Kategori Keluhan (.xlsx)",
-                data=excel_kategori,
-                file_name='kategori_keluhan.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-
-        st.header("Beberapa Visualisasi Data")
-        st.subheader("Jumlah Keluhan Masyarakat berdasarkan Media")
-        
-        # Grafik batang
-        kategori = kategori.sort_values(by='Jumlah', ascending=False)
-        bars = alt.Chart(kategori).mark_bar(
-            cornerRadiusTopLeft=5,
-            cornerRadiusTopRight=5
-        ).encode(
-            x=alt.X('Channel:N', sort='-y', title=None),
-            y=alt.Y('Jumlah:Q', title=None),
-            color=alt.Color('Channel:N', legend=None, scale=alt.Scale(scheme='category10')),
-            tooltip=['Channel', 'Jumlah']
-        )
-
-        # jumlah kategori
-        text = alt.Chart(kategori).mark_text(
-            align='center',
-            baseline='bottom',
-            dy=-5,
-            fontSize=12,
-            color='white'
-        ).encode(
-            x=alt.X('Channel:N', sort='-y'),
-            y='Jumlah:Q',
-            text='Jumlah:Q'
+        tampilkan_snapshot(snapshot_file, debug)
+    except ValueError as ve:
+        st.error(f"Error: {ve}")
+elif uploaded_files:
+    try:
+        file_hash = hash_upload(uploaded_files)
+        instrumentasi = instrumentasi_sesi(file_hash)
+
+        cube = None
+        if kumulatif:
+            file_hash, cube, baru, total = tambah_kumulatif(file_hash, uploaded_files, instrumentasi)
+            st.info(f"{baru} baris baru atau diperbarui; rekap kumulatif berisi {total} baris.")
+
+        # Semua rekap dan grafik dibaca dari satu cube gabungan seluruh file.
+        # Pemrosesan berjalan di latar belakang; halaman memeriksa statusnya
+        # berkala dan menampilkan hasil setiap tahap begitu tersedia.
+        pekerjaan = pekerjaan_sesi(
+            file_hash, lambda: tahap_pemrosesan(file_hash, isi_uploads(uploaded_files), cube), instrumentasi
         )
+        # Status dibaca sekali: thread pekerja masih dapat mengisi pekerjaan.hasil
+        # selama halaman ini dijalankan
+        selesai = pekerjaan.selesai
+        error = pekerjaan.error
+        hasil = dict(pekerjaan.hasil)
+        if error is not None:
+            # Pekerjaan yang gagal dibuang agar rerun berikutnya (misalnya upload
+            # ulang file yang sama) mencoba lagi, bukan menampilkan error lama
+            st.session_state.pop('pekerjaan', None)
+            if 'AUTO_RKM' not in hasil:
+                raise error
+            st.error(f"Error: {error}")
+
+        if selesai:
+            st.success('Proses selesai!')
+        else:
+            st.progress(pekerjaan.progres, text=LABEL_TAHAP.get(pekerjaan.tahap_aktif, 'Menunggu antrean...'))
+
+        if 'AUTO_RKM' in hasil:
+            cube = hasil['parse']
+            rkm, kategori = hasil['AUTO_RKM']
+
+            # Kolom wajib sudah diperiksa dari header sebelum parse; kolom yang hanya
+            # dipakai grafik cukup diberitahukan
+            hilang = [col for col in KOLOM_DIPAKAI if col not in cube.columns]
+            if hilang:
+                st.warning(f"Kolom {', '.join(hilang)} tidak ditemukan; grafik yang membutuhkannya tidak dapat ditampilkan.")
+
+            # Tampilan terfilter memakai hash sendiri sehingga rekap, spec grafik dan
+            # file unduhannya tersimpan per kombinasi filter
+            hash_tampilan = file_hash
+            tanggal, nilai = panel_filter(indeks_filter(file_hash, cube))
+            if tanggal is not None or nilai:
+                hash_tampilan = hash_gabungan([file_hash, repr((tanggal, nilai))])
+                with instrumentasi.ukur('filter'):
+                    cube = indeks_filter(file_hash, cube).saring(cube, tanggal, nilai)
+                    rkm, kategori = rekap_upload(hash_tampilan, cube)
+                if cube.empty:
+                    st.warning("Tidak ada data yang sesuai dengan filter.")
+                else:
+                    st.caption(f"Menampilkan {int(cube['Jumlah'].sum())} baris sesuai filter.")
+            grafik = TabelGrafik.dari_cube(cube)
+
+            st.header("Hasil RKM")
+            st.dataframe(rkm)
+
+            st.header("Jumlah Keluhan berdasarkan Kategori")
+            st.dataframe(kategori)
+
+            # Satu workbook berisi rekap, kategori dan (opsional) tabel grafik
+            unduhan(hash_tampilan, grafik, rkm, kategori)
+
+        indeks = None
+        if hasil.get('indeks') is not None:
+            indeks = hasil['indeks'] if hash_tampilan == file_hash else indeks_topik(hash_tampilan, cube)
+
+        if indeks is not None:
+            st.header("Beberapa Visualisasi Data")
+            dashboard(hash_tampilan, grafik, kategori, indeks)
+
+        if 'indeks' in hasil:
+            # Rekap, tabel grafik dan indeks disimpan agar laporan dapat dibuka lagi
+            # kapan saja tanpa mengupload ulang file Excel; file tanpa kolom grafik
+            # disimpan dengan indeks kosong
+            st.header("Simpan Laporan")
+            unduhan_snapshot(hash_tampilan, cube, rkm, kategori, indeks)
+
+            if debug:
+                panel_debug(instrumentasi, {'cube': cube, 'rkm': rkm, 'kategori': kategori, 'indeks': indeks})
 
-        chart = (bars + text).properties(
-            width=600,
-            height=400,
-        ).configure_axis(
-            labelFontSize=12,
-            titleFontSize=18
-        ).configure_title(
-            fontSize=18,
-            anchor='start',
-            color='gray'
-        ).configure_axisX(
-            labelLimit=0 
-        )
-        st.altair_chart(chart, use_container_width=True)
-
-        #Visualisasi Kecamatab
-        st.subheader("5 Kecamatan dengan Keluhan Masyarakat Terbanyak")
-        vis_kecamatan(data)
-
-        #Visualisasi Kelurahan
-        st.subheader("5 Kelurahan dengan Keluhan Masyarakat Terbanyak")
-        vis_kelurahan(data)
-
-        #Visualisasi Kategori
-        st.subheader("Persentase Jenis Kategori")
-        persen_kategori(data)
-        
-        #Visualisasi tren harian keluhan
-        st.subheader("Jumlah Keluhan per Hari")
-        tren_keluhan(data)
-
-        # Visualisasi OPD Keluhan terbanyak
-        st.subheader('5 OPD Teratas yang Mendapatkan Keluhan')
-        opd_vis(data)
-
-        # Visualisasi tiap opd yang mendapatkan keluhan terbanyak
-        st.subheader('Keluhan terhadap OPD')
-        top5Opd_keluhan_vis(data)
-
-        #visualisasi tren permohonan informasi
-        st.subheader('Jumlah Permohonan Informasi per Hari')
-        tren_permohonan_info(data)
-
-        # Visualisasi OPD Permohonan Info terbanyak
-        st.subheader('5 OPD Teratas yang Mendapatkan Permohonan Informasi')
-        opdInfo_vis(data)
-
-        # Visualisasi tiap opd yang mendapatkan permohonan Informasi terbanyak
-        st.subheader('Permohonan Informasi terhadap OPD')
-        top5Opd_permohonanInfo_vis(data)
-        
     except ValueError as ve:
         st.error(f"Error: {ve}")
     except Exception as e:
         st.error("Terjadi kesalahan saat memproses file. Pastikan file Excel valid dan formatnya benar.")
         st.error(f"Detail error: {e}")
+    else:
+        if not selesai:
+            time.sleep(JEDA_POLLING)
+            rerun()
 else:
+    # Upload dihapus: pekerjaan yang masih berjalan tidak diperlukan lagi
+    if st.session_state.get('pekerjaan') is not None:
+        st.session_state.pop('pekerjaan').batal()
     st.info("Silakan upload file Excel terlebih dahulu.")
@@ -0,0 +1,22 @@
+from auto_rkm.agregasi import (
+    AUTO_RKM,
+    AWALAN_OPD,
+    CUBE_DIMS,
+    GabunganCube,
+    KOLOM_WAJIB,
+    buat_cube,
+    count_by,
+    daftar_opd,
+    flag_opd,
+    gabung_cube,
+    padatkan_cube,
+    rekap_cube,
+    validasi_kolom,
+)
+from auto_rkm.akumulasi import RekapKumulatif
+from auto_rkm.cache import CacheMemori
+from auto_rkm.batch import hash_gabungan, isi_upload, proses_banyak_file, proses_banyak_path
+from auto_rkm.ekspor import to_excel
+from auto_rkm.indeks import IndeksFilter, IndeksTopik
+from auto_rkm.instrumentasi import Instrumentasi
+from auto_rkm.pembacaan import baca_excel, baca_excel_streaming, hash_isi, muat_cube
@@ -0,0 +1,165 @@
+import os
+
+import pandas as pd
+
+# Awalan nama Instansi yang dihitung sebagai OPD pada grafik OPD dan drill-down,
+# dapat diubah lewat AUTO_RKM_AWALAN_OPD (dipisah koma)
+AWALAN_OPD = tuple(
+    awalan.strip() for awalan in os.environ.get('AUTO_RKM_AWALAN_OPD', 'Dinas').split(',') if awalan.strip()
+)
+
+# Kolom yang wajib ada untuk menyusun rekap RKM
+KOLOM_WAJIB = {'Instansi', 'Topik', 'Channel', 'Status'}
+
+# Dimensi count cube; satu baris cube = satu kombinasi nilai dengan jumlah barisnya
+CUBE_DIMS = ['Status', 'Kategori', 'Instansi', 'Kecamatan', 'Kelurahan', 'Channel', 'Topik', 'Tanggal Keluhan']
+
+def buat_cube(data, backend=None, normalisasi=True):
+    # normalisasi=False untuk cube parsial yang masih akan digabung: varian ejaan
+    # dibiarkan apa adanya agar bentuk baku dipilih dari seluruh data sekaligus
+    from auto_rkm.backend import CUBE_BACKEND, pilih_backend, samakan_tipe
+
+    dims = [col for col in CUBE_DIMS if col in data.columns]
+    data_cube = data[dims]
+    if 'Tanggal Keluhan' in dims and not pd.api.types.is_datetime64_any_dtype(data_cube['Tanggal Keluhan']):
+        data_cube = data_cube.assign(**{
+            'Tanggal Keluhan': pd.to_datetime(data_cube['Tanggal Keluhan'], errors='coerce')
+        })
+
+    # Data besar dapat diagregasi dengan polars/duckdb; hasilnya identik dengan pandas
+    backend = pilih_backend(len(data_cube), backend)
+    if backend != 'pandas':
+        return padatkan_cube(samakan_tipe(CUBE_BACKEND[backend](data_cube, dims), data_cube), normalisasi)
+
+    if 'Tanggal Keluhan' in dims:
+        # Tanggal dibulatkan ke hari agar cube tetap ringkas
+        data_cube = data_cube.assign(**{'Tanggal Keluhan': data_cube['Tanggal Keluhan'].dt.normalize()})
+
+    # Satu kali scan data; urutan baris mengikuti kemunculan pertama setiap kombinasi
+    cube = data_cube.groupby(dims, sort=False, dropna=False, observed=True).size().reset_index(name='Jumlah')
+    return padatkan_cube(cube, normalisasi)
+
+def gabung_cube(cubes, normalisasi=True):
+    # Menjumlahkan beberapa cube parsial; urutan kemunculan pertama tetap terjaga.
+    # Agar bentuk baku dipilih dari seluruh data, cube masukan dibuat dengan
+    # normalisasi=False (lihat buat_cube).
+    gabungan = pd.concat([c for c in cubes if c is not None], ignore_index=True)
+    dims = [col for col in CUBE_DIMS if col in gabungan.columns]
+    cube = gabungan.groupby(dims, sort=False, dropna=False, observed=True)['Jumlah'].sum().reset_index()
+    return padatkan_cube(cube, normalisasi)
+
+class GabunganCube:
+    # Menggabungkan cube parsial dari banyak batch secara bertingkat seperti
+    # merge sort: dua cube teratas dengan tingkat yang sama digabung menjadi satu
+    # tingkat di atasnya. Setiap baris cube hanya dikelompokkan ulang O(log n)
+    # kali, bukan sekali per batch seperti bila cube berjalan digabung terus.
+    # Cube parsial disimpan tanpa normalisasi; normalisasi dijalankan sekali di
+    # hasil() sehingga bentuk baku sama dengan rekap seluruh data sekaligus.
+
+    def __init__(self):
+        self.tumpukan = []
+
+    def tambah(self, cube):
+        tingkat = 0
+        while self.tumpukan and self.tumpukan[-1][0] == tingkat:
+            # Cube yang lebih awal di depan agar urutan kemunculan pertama tetap
+            cube = gabung_cube([self.tumpukan.pop()[1], cube], normalisasi=False)
+            tingkat += 1
+        self.tumpukan.append((tingkat, cube))
+
+    def hasil(self, normalisasi=True):
+        if not self.tumpukan:
+            return None
+        if len(self.tumpukan) == 1:
+            return padatkan_cube(self.tumpukan[0][1], normalisasi)
+        return gabung_cube([cube for _, cube in self.tumpukan], normalisasi)
+
+def padatkan_cube(cube, normalisasi=True):
+    from auto_rkm.normalisasi import normalisasi_cube
+
+    # Bentuk kanonik cube yang hemat memori: dimensi teks sebagai category (kode
+    # int8/int16), tanggal datetime64 dan Jumlah int32. Cube gabungan file dengan
+    # kategori berbeda kembali menjadi object sehingga perlu dipadatkan ulang.
+    # Teks Topik, Instansi dan lokasi juga dinormalisasi pada level kategori,
+    # kecuali normalisasi=False (cube parsial yang masih akan digabung).
+    kolom = {}
+    for col in cube.columns:
+        if col == 'Jumlah':
+            if cube[col].dtype != 'int32' and (cube[col].empty or cube[col].max() < 2**31):
+                kolom[col] = cube[col].astype('int32')
+        elif col == 'Tanggal Keluhan':
+            if not pd.api.types.is_datetime64_any_dtype(cube[col]):
+                kolom[col] = pd.to_datetime(cube[col], errors='coerce')
+        elif not isinstance(cube[col].dtype, pd.CategoricalDtype):
+            kolom[col] = cube[col].astype('category')
+    cube = cube.assign(**kolom) if kolom else cube
+    return normalisasi_cube(cube) if normalisasi else cube
+
+def count_by(cube, dim, filters=None, top_n=None):
+    # filters: {kolom: nilai}, nilai boleh skalar, list/set, atau fungsi Series -> mask
+    mask = pd.Series(True, index=cube.index)
+    for col, nilai in (filters or {}).items():
+        if callable(nilai):
+            mask &= nilai(cube[col])
+        elif isinstance(nilai, (list, tuple, set)):
+            mask &= cube[col].isin(nilai)
+        else:
+            mask &= cube[col] == nilai
+
+    # Hanya dua kolom yang difilter, bukan salinan seluruh cube
+    hasil = cube['Jumlah'][mask].groupby(cube[dim][mask], sort=False, observed=True).sum()
+    hasil = hasil.sort_values(ascending=False, kind='stable')
+    if top_n is not None:
+        hasil = hasil.head(top_n)
+    return hasil.reset_index()
+
+def daftar_opd(instansi, awalan=AWALAN_OPD):
+    # Dicek pada nilai unik Instansi saja, bukan per baris
+    unik = pd.Series(instansi.dropna().unique()).astype(str)
+    return set(unik[unik.str.startswith(awalan)])
+
+def flag_opd(instansi, awalan=AWALAN_OPD):
+    return instansi.isin(daftar_opd(instansi, awalan))
+
+def validasi_kolom(kolom):
+    hilang = KOLOM_WAJIB.difference(kolom)
+    if hilang:
+        raise ValueError(f"File Excel harus mengandung kolom: {KOLOM_WAJIB}. Tidak ditemukan: {sorted(hilang)}")
+
+def rekap_cube(cube):
+    validasi_kolom(cube.columns)
+
+    selesai = cube[cube['Status'] == 'Selesai']
+
+    # Urutan Instansi, Topik dan Channel mengikuti kemunculan pertama pada data
+    # sehingga hasilnya deterministik
+    per_instansi = selesai[selesai['Instansi'].notna()]
+    per_topik = per_instansi.drop_duplicates(['Instansi', 'Topik'])
+    per_topik = per_topik[per_topik['Topik'].notna()]
+
+    rkm = per_instansi.groupby('Instansi', sort=False, observed=True)['Jumlah'].sum().reset_index()
+    # Kolom category dari hasil baca dikembalikan menjadi teks biasa
+    rkm['Instansi'] = rkm['Instansi'].astype(object)
+    topik = per_topik.groupby('Instansi', sort=False, observed=True)['Topik'].agg(
+        lambda x: ', '.join(x.astype(str))
+    )
+    rkm['Topik'] = rkm['Instansi'].map(topik).fillna('')
+    rkm['Ditindaklanjuti'] = rkm['Jumlah']
+    rkm['Belum Ditindaklanjuti'] = rkm['Jumlah'] - rkm['Ditindaklanjuti']
+
+    rkm = rkm[['Instansi', 'Jumlah', 'Ditindaklanjuti', 'Belum Ditindaklanjuti', 'Topik']]
+    rkm = rkm.sort_values(by='Jumlah', ascending=False).reset_index(drop=True)
+
+    kategori_keluhan = selesai.groupby('Channel', sort=False, observed=True)['Jumlah'].sum()
+    kategori_keluhan = kategori_keluhan.sort_values(ascending=False).reset_index()
+    kategori_keluhan.columns = ['Channel', 'Jumlah']
+    kategori_keluhan['Channel'] = kategori_keluhan['Channel'].astype(object)
+
+    return rkm, kategori_keluhan
+
+def AUTO_RKM(data):
+    required_cols = {'Instansi', 'Topik', 'Channel', 'Status'}
+    if not required_cols.issubset(data.columns):
+        raise ValueError(f"File Excel harus mengandung kolom: {required_cols}")
+
+    return rekap_cube(buat_cube(data[list(required_cols)]))
@@ -0,0 +1,351 @@
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from auto_rkm.agregasi import CUBE_DIMS, buat_cube, gabung_cube, padatkan_cube
+from auto_rkm.batch import isi_upload
+from auto_rkm.pembacaan import CACHE_DIR, KOLOM_DIPAKAI, baca_excel, baca_header, parquet_tersedia, petakan_kolom
+
+# Folder state rekap kumulatif, dapat diubah lewat AUTO_RKM_FOLDER_AKUMULASI
+FOLDER_AKUMULASI = os.environ.get('AUTO_RKM_FOLDER_AKUMULASI', os.path.join(CACHE_DIR, 'akumulasi'))
+# Kolom ID keluhan untuk deduplikasi; baris tanpa ID memakai hash seluruh isi baris
+KOLOM_ID = os.environ.get('AUTO_RKM_KOLOM_ID', 'No Tiket')
+# Potongan file riwayat digabung menjadi satu file bila jumlahnya melebihi batas ini
+MAKS_POTONGAN_RIWAYAT = 32
+VERSI_STATE = 2
+
+def hash_baris(data):
+    return pd.util.hash_pandas_object(data.astype(str), index=False).to_numpy()
+
+def kunci_baris(data, kolom_id=KOLOM_ID):
+    # Satu kunci uint64 per baris untuk mengenali baris yang sudah pernah dihitung
+    if kolom_id not in data.columns:
+        return hash_baris(data)
+
+    nilai_id = data[kolom_id]
+    # ID angka bisa terbaca float bila kolomnya berisi sel kosong (123.0 == 123)
+    if pd.api.types.is_float_dtype(nilai_id) and (nilai_id.dropna() % 1 == 0).all():
+        nilai_id = nilai_id.astype('Int64')
+    kunci = pd.util.hash_pandas_object(nilai_id.astype(str).str.strip(), index=False).to_numpy()
+
+    tanpa_id = nilai_id.isna().to_numpy()
+    if tanpa_id.any():
+        kunci[tanpa_id] = hash_baris(data[tanpa_id])
+    return kunci
+
+def baca_delta(isi_file, kolom_id=KOLOM_ID):
+    # Cukup kolom rekap dan kolom ID. Header dibaca lebih dulu: tanpa kolom ID
+    # seluruh kolom dibaca untuk hash baris, tanpa parse workbook dua kali.
+    sumber = BytesIO(isi_file)
+    ada_id = kolom_id in petakan_kolom(baca_header(sumber), kolom=None).values()
+    return baca_excel(sumber, kolom=KOLOM_DIPAKAI + [kolom_id] if ada_id else None)
+
+@contextmanager
+def kunci_eksklusif(folder):
+    # Lock file lintas proses dan thread: hanya satu penulis yang memuat, menambah
+    # dan menyimpan state pada satu waktu sehingga tidak ada update yang hilang
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, '.lock'), 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK menyerah setelah sekitar 10 detik; dicoba lagi sampai dapat
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def padatkan_riwayat(riwayat):
+    # Satu baris per kunci (potongan yang lebih baru menang), urut kunci untuk pencarian biner
+    riwayat = riwayat.drop_duplicates('kunci', keep='last').sort_values('kunci', kind='stable')
+    kolom = {
+        col: riwayat[col].astype('category')
+        for col in riwayat.columns if col in CUBE_DIMS and col != 'Tanggal Keluhan'
+    }
+    return riwayat.assign(**kolom).reset_index(drop=True)
+
+def hash_kombinasi(cube, dims):
+    # Satu hash uint64 per kombinasi dimensi cube. Kolom category di-hash menurut
+    # nilainya, bukan kodenya, sehingga cube dengan daftar kategori berbeda tetap
+    # dapat dicocokkan; tanggal disamakan ke satuan ns lebih dulu.
+    kolom = {}
+    if 'Tanggal Keluhan' in dims:
+        kolom['Tanggal Keluhan'] = cube['Tanggal Keluhan'].astype('datetime64[ns]')
+    return pd.util.hash_pandas_object(cube[dims].assign(**kolom), index=False).to_numpy()
+
+def kolom_kosong(col, n):
+    # Kolom berisi nilai kosong untuk dimensi yang tidak ada di salah satu sisi
+    if col == 'Tanggal Keluhan':
+        return pd.Series(np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]'))
+    return pd.Series(pd.Categorical.from_codes(np.full(n, -1), categories=pd.Index([], dtype=object)))
+
+def sisipkan_kolom(lama, nilai, ubah, sisip=None):
+    # Memperbarui kolom tanpa mengelompokkan ulang: nilai[:len(ubah)] mengganti
+    # baris pada posisi ubah, sisanya disisipkan sebelum posisi sisip (hasil
+    # searchsorted) atau ditambahkan di akhir bila sisip None. Kolom category hanya
+    # ditambah kategori barunya sehingga kode baris lama tetap berlaku.
+    kategorikal = isinstance(lama.dtype, pd.CategoricalDtype)
+    if kategorikal:
+        kategori = lama.cat.categories
+        nilai = pd.Series(nilai).astype(object)
+        unik = pd.unique(nilai.dropna().to_numpy())
+        baru = kategori.get_indexer(unik) == -1
+        if baru.any():
+            kategori = kategori.append(pd.Index(unik[baru], dtype=object))
+        isi = lama.cat.codes.to_numpy().astype(np.int64)
+        pengganti = kategori.get_indexer(nilai)
+    else:
+        isi = lama.to_numpy().copy()
+        pengganti = pd.Series(nilai).to_numpy().astype(isi.dtype)
+
+    isi[ubah] = pengganti[:len(ubah)]
+    sisa = pengganti[len(ubah):]
+    isi = np.append(isi, sisa) if sisip is None else np.insert(isi, sisip, sisa)
+    return pd.Categorical.from_codes(isi, categories=kategori) if kategorikal else isi
+
+def samakan_kolom(lama, baru):
+    # Dimensi yang hanya ada di salah satu sisi diisi nilai kosong di sisi lainnya
+    for col in baru.columns.difference(lama.columns):
+        lama = lama.assign(**{col: kolom_kosong(col, len(lama)).to_numpy()})
+    for col in lama.columns.difference(baru.columns):
+        baru = baru.assign(**{col: kolom_kosong(col, len(baru)).to_numpy()})
+    return lama, baru
+
+class RekapKumulatif:
+    # State rekap yang dapat digabung dan disimpan di disk: cube jumlah per kombinasi
+    # dimensi (termasuk Topik per Instansi) dan riwayat nilai dimensi terakhir setiap
+    # kunci baris. Upload berikutnya hanya menambahkan baris baru, dan baris dengan
+    # ID yang sama tetapi isinya berubah (misalnya Proses -> Selesai) mengganti
+    # kontribusi lamanya di cube. Waktunya sebanding dengan jumlah baris baru atau
+    # berubah, bukan seluruh riwayat: kombinasi cube dan kunci riwayat dicari
+    # dengan pencarian biner, jumlahnya diperbarui di tempat, dan baris baru
+    # disisipkan tanpa mengelompokkan atau mengurutkan ulang seluruh state.
+    # Cube tersimpan belum dinormalisasi dan dapat memuat kombinasi berjumlah 0;
+    # properti cube membuang keduanya saat dibaca.
+
+    def __init__(self, folder=FOLDER_AKUMULASI):
+        self.folder = folder
+        self.cube_mentah = None
+        self.cube_normal = None
+        # Hash kombinasi cube yang terurut dan nomor baris cube-nya, untuk pencarian biner
+        self.hash_cube = None
+        self.baris_cube = None
+        self.riwayat = pd.DataFrame({'kunci': np.empty(0, dtype=np.uint64), 'isi': np.empty(0, dtype=np.uint64)})
+        self.versi = None
+        self.file_cube = None
+        self.file_riwayat = []
+        self.riwayat_tertunda = []
+
+    @classmethod
+    def muat(cls, folder=FOLDER_AKUMULASI):
+        state = cls(folder)
+        path = os.path.join(folder, 'state.json')
+        if not os.path.exists(path):
+            return state
+
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format', 1) < VERSI_STATE:
+            raise ValueError(f"State rekap kumulatif di {folder} dibuat versi lama; hapus folder tersebut lalu upload ulang.")
+        state.versi = manifest['versi']
+        state.file_cube = manifest['cube']
+        state.file_riwayat = manifest['riwayat']
+        if state.file_cube:
+            state.cube_mentah = pd.read_parquet(os.path.join(folder, state.file_cube))
+        if state.file_riwayat:
+            state.riwayat = padatkan_riwayat(pd.concat(
+                [pd.read_parquet(os.path.join(folder, nama)) for nama in state.file_riwayat], ignore_index=True
+            ))
+        return state
+
+    @classmethod
+    @contextmanager
+    def dibuka(cls, folder=FOLDER_AKUMULASI):
+        # Muat, tambah dan simpan dijalankan di bawah lock eksklusif folder:
+        #     with RekapKumulatif.dibuka(folder) as state:
+        #         state.tambah_upload(...)
+        #         state.simpan()
+        with kunci_eksklusif(folder):
+            yield cls.muat(folder)
+
+    @property
+    def cube(self):
+        if self.cube_mentah is None:
+            return None
+        if self.cube_normal is None:
+            self.cube_normal = padatkan_cube(self.cube_terisi())
+        return self.cube_normal
+
+    def cube_terisi(self):
+        cube = self.cube_mentah[self.cube_mentah['Jumlah'] != 0].reset_index(drop=True)
+        return cube.assign(Jumlah=cube['Jumlah'].astype(np.int64))
+
+    @property
+    def kunci(self):
+        return self.riwayat['kunci'].to_numpy()
+
+    @property
+    def jumlah_baris(self):
+        return len(self.riwayat)
+
+    def tambah(self, data):
+        # Mengembalikan jumlah baris yang mengubah rekap (baru atau isinya berubah)
+        dims = [col for col in CUBE_DIMS if col in data.columns]
+        baris = data[dims]
+        if 'Tanggal Keluhan' in dims:
+            baris = baris.assign(**{
+                'Tanggal Keluhan': pd.to_datetime(baris['Tanggal Keluhan'], errors='coerce').dt.normalize()
+            })
+        kunci = kunci_baris(data)
+        baris = baris.assign(kunci=kunci, isi=hash_baris(baris))
+        # ID yang muncul lebih dari sekali dalam satu upload: baris terakhir dianggap terbaru
+        baris = baris[~pd.Series(kunci).duplicated(keep='last').to_numpy()].reset_index(drop=True)
+
+        # Pencarian biner pada kunci riwayat yang terurut
+        kunci_lama = self.kunci
+        kunci = baris['kunci'].to_numpy()
+        posisi = np.searchsorted(kunci_lama, kunci)
+        ada = posisi < len(kunci_lama)
+        ada[ada] = kunci_lama[posisi[ada]] == kunci[ada]
+        berubah = ada.copy()
+        berubah[ada] = self.riwayat['isi'].to_numpy()[posisi[ada]] != baris['isi'].to_numpy()[ada]
+        dihitung = ~ada | berubah
+        if not dihitung.any():
+            return 0
+
+        # Delta cube: kontribusi baris baru/berubah dikurangi kontribusi lama baris
+        # yang berubah; hanya kombinasi di delta ini yang disentuh
+        cubes = [buat_cube(baris[dihitung], normalisasi=False)]
+        if berubah.any():
+            kurang = buat_cube(self.riwayat.iloc[posisi[berubah]], normalisasi=False)
+            cubes.append(kurang.assign(Jumlah=-kurang['Jumlah']))
+        self.terapkan_delta(gabung_cube(cubes, normalisasi=False))
+
+        # Kunci baru disisipkan ke riwayat terurut; baris yang berubah diganti di tempat
+        baru = baris[~ada].assign(posisi=posisi[~ada]).sort_values('kunci', kind='stable')
+        self.perbarui_riwayat(posisi[berubah], baris[berubah], baru.pop('posisi').to_numpy(), baru)
+        baris = baris[dihitung]
+        self.riwayat_tertunda.append(baris)
+        return len(baris)
+
+    def terapkan_delta(self, delta):
+        self.cube_normal = None
+        if self.cube_mentah is None:
+            self.cube_mentah = delta.assign(Jumlah=delta['Jumlah'].astype(np.int64))
+            self.hash_cube = None
+            return
+
+        cube, delta = samakan_kolom(self.cube_mentah, delta)
+        if len(cube.columns) != len(self.cube_mentah.columns):
+            # Dimensi baru: semua hash kombinasi lama berubah
+            self.hash_cube = None
+        dims = [col for col in CUBE_DIMS if col in cube.columns]
+        if self.hash_cube is None:
+            # Dibangun sekali setelah state dimuat, bukan setiap tambah
+            semua = hash_kombinasi(cube, dims)
+            self.baris_cube = np.argsort(semua, kind='stable')
+            self.hash_cube = semua[self.baris_cube]
+
+        # Delta sudah dikelompokkan: setiap hash muncul sekali
+        hash_delta = hash_kombinasi(delta, dims)
+        posisi = np.searchsorted(self.hash_cube, hash_delta)
+        ada = posisi < len(self.hash_cube)
+        ada[ada] = self.hash_cube[posisi[ada]] == hash_delta[ada]
+
+        jumlah = cube['Jumlah'].to_numpy().astype(np.int64)
+        jumlah[self.baris_cube[posisi[ada]]] += delta['Jumlah'].to_numpy()[ada]
+        kolom = {col: cube[col] for col in dims}
+        baru = ~ada
+        if baru.any():
+            # Kombinasi baru ditambahkan di akhir cube dan hash-nya disisipkan terurut
+            tambahan = delta[baru]
+            kolom = {col: sisipkan_kolom(cube[col], tambahan[col], []) for col in dims}
+            nomor = np.arange(len(cube), len(cube) + len(tambahan))
+            urut = np.argsort(hash_delta[baru], kind='stable')
+            self.hash_cube = np.insert(self.hash_cube, posisi[baru][urut], hash_delta[baru][urut])
+            self.baris_cube = np.insert(self.baris_cube, posisi[baru][urut], nomor[urut])
+            jumlah = np.append(jumlah, tambahan['Jumlah'].to_numpy())
+        self.cube_mentah = pd.DataFrame({**kolom, 'Jumlah': jumlah})
+
+    def perbarui_riwayat(self, ubah, nilai_ubah, sisip, nilai_sisip):
+        if self.riwayat.empty:
+            self.riwayat = padatkan_riwayat(nilai_sisip)
+            return
+        riwayat, nilai = samakan_kolom(self.riwayat, pd.concat([nilai_ubah, nilai_sisip], ignore_index=True))
+        self.riwayat = pd.DataFrame({
+            col: sisipkan_kolom(riwayat[col], nilai[col], ubah, sisip) for col in riwayat.columns
+        })
+
+    def tambah_upload(self, daftar_isi):
+        # Mengembalikan jumlah baris baru atau berubah dari seluruh file
+        return sum(self.tambah(baca_delta(isi)) for isi in daftar_isi)
+
+    def tambah_path(self, daftar_path):
+        jumlah = 0
+        for path in daftar_path:
+            with open(path, 'rb') as f:
+                jumlah += self.tambah_upload(isi_upload(path, f.read()))
+        return jumlah
+
+    def simpan(self):
+        if not parquet_tersedia():
+            raise ValueError("Rekap kumulatif membutuhkan paket pyarrow.")
+        if not self.riwayat_tertunda and self.versi is not None:
+            return
+
+        os.makedirs(self.folder, exist_ok=True)
+        versi = uuid.uuid4().hex
+        nama_cube = None
+        if self.cube_mentah is not None:
+            nama_cube = f'cube-{versi}.parquet'
+            self.cube_terisi().to_parquet(os.path.join(self.folder, nama_cube), index=False)
+
+        if len(self.file_riwayat) >= MAKS_POTONGAN_RIWAYAT:
+            # Semua potongan dipadatkan menjadi satu file
+            file_riwayat, isi_riwayat = [], self.riwayat
+        else:
+            file_riwayat = list(self.file_riwayat)
+            isi_riwayat = pd.concat(self.riwayat_tertunda, ignore_index=True) if self.riwayat_tertunda else None
+        if isi_riwayat is not None:
+            file_riwayat.append(f'riwayat-{versi}.parquet')
+            isi_riwayat.to_parquet(os.path.join(self.folder, file_riwayat[-1]), index=False)
+
+        # state.json diganti secara atomik; file lama baru dihapus setelahnya sehingga
+        # state di disk selalu konsisten walaupun proses terhenti di tengah jalan
+        manifest = {'format': VERSI_STATE, 'versi': versi, 'cube': nama_cube, 'riwayat': file_riwayat}
+        path_tmp = os.path.join(self.folder, f'.state-{versi}.json')
+        with open(path_tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(path_tmp, os.path.join(self.folder, 'state.json'))
+
+        # Hanya file versi sebelumnya yang dimuat penulis ini yang dihapus, bukan
+        # semua file yang tidak dikenal
+        lama = set(self.file_riwayat) | {self.file_cube}
+        for nama in lama - set(file_riwayat) - {nama_cube, None}:
+            try:
+                os.remove(os.path.join(self.folder, nama))
+            except OSError:
+                pass
+
+        self.versi = versi
+        self.file_cube = nama_cube
+        self.file_riwayat = file_riwayat
+        self.riwayat_tertunda = []
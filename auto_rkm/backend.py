@@ -0,0 +1,98 @@
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+# Mesin agregasi count cube: 'auto', 'pandas', 'duckdb' atau 'polars'. Dengan
+# 'auto', data besar memakai polars/duckdb (multithread) bila terpasang.
+BACKEND = os.environ.get('AUTO_RKM_BACKEND', 'auto')
+# Di bawah jumlah baris ini pandas tetap dipakai karena biaya konversi lebih besar
+BATAS_BARIS_BACKEND = int(os.environ.get('AUTO_RKM_BATAS_BARIS_BACKEND', '500000'))
+
+URUTAN_BACKEND = ['polars', 'duckdb']
+
+def backend_tersedia():
+    return ['pandas'] + [nama for nama in URUTAN_BACKEND if importlib.util.find_spec(nama) is not None]
+
+def pilih_backend(n_baris, backend=None):
+    backend = backend or BACKEND
+    if backend != 'auto':
+        if backend not in backend_tersedia():
+            raise ValueError(f"Backend {backend} tidak tersedia. Pilihan: {backend_tersedia()}")
+        return backend
+    if n_baris < BATAS_BARIS_BACKEND:
+        return 'pandas'
+    tersedia = backend_tersedia()
+    return tersedia[1] if len(tersedia) > 1 else 'pandas'
+
+def ekspresi_duckdb(dims):
+    # Tanggal dibulatkan ke hari seperti dt.normalize() pada backend pandas
+    return ', '.join(
+        'CAST(date_trunc(\'day\', "Tanggal Keluhan") AS TIMESTAMP) AS "Tanggal Keluhan"'
+        if col == 'Tanggal Keluhan' else f'"{col}"'
+        for col in dims
+    )
+
+def cube_duckdb(data, dims):
+    import duckdb
+
+    # Urutan kemunculan pertama dijaga lewat nomor baris, sama dengan groupby(sort=False)
+    con = duckdb.connect()
+    try:
+        con.register('data', data[dims].assign(_baris=np.arange(len(data))))
+        return con.execute(
+            f'SELECT {ekspresi_duckdb(dims)}, COUNT(*) AS "Jumlah" FROM data GROUP BY ALL ORDER BY MIN(_baris)'
+        ).df()
+    finally:
+        con.close()
+
+def cube_polars(data, dims):
+    import polars as pl
+
+    frame = pl.from_pandas(data[dims])
+    if 'Tanggal Keluhan' in dims:
+        frame = frame.with_columns(pl.col('Tanggal Keluhan').dt.truncate('1d'))
+    return frame.group_by(dims, maintain_order=True).len(name='Jumlah').to_pandas()
+
+def cube_parquet_duckdb(path, dims):
+    import duckdb
+
+    con = duckdb.connect()
+    try:
+        return con.execute(
+            f'SELECT {ekspresi_duckdb(dims)}, COUNT(*) AS "Jumlah" '
+            'FROM read_parquet(?, file_row_number = true) GROUP BY ALL ORDER BY MIN(file_row_number)',
+            [path]
+        ).df()
+    finally:
+        con.close()
+
+def cube_parquet_polars(path, dims):
+    import polars as pl
+
+    frame = pl.scan_parquet(path).select(dims)
+    if 'Tanggal Keluhan' in dims:
+        frame = frame.with_columns(pl.col('Tanggal Keluhan').cast(pl.Datetime('us')).dt.truncate('1d'))
+    return frame.group_by(dims, maintain_order=True).len(name='Jumlah').collect().to_pandas()
+
+CUBE_BACKEND = {'duckdb': cube_duckdb, 'polars': cube_polars}
+CUBE_PARQUET_BACKEND = {'duckdb': cube_parquet_duckdb, 'polars': cube_parquet_polars}
+
+def samakan_tipe(cube, data=None):
+    # Tipe kolom disamakan dengan hasil backend pandas: kategori mengikuti kolom
+    # asal bila ada, tanggal memakai resolusi yang sama
+    kolom = {}
+    for col in cube.columns:
+        asal = data[col].dtype if data is not None and col in data.columns else None
+        if col == 'Tanggal Keluhan':
+            kolom[col] = pd.to_datetime(cube[col]).astype(asal) if asal is not None else pd.to_datetime(cube[col])
+        elif isinstance(asal, pd.CategoricalDtype):
+            # Urutan kategori dari backend bisa berbeda; dipetakan ulang ke kategori asal
+            nilai = cube[col]
+            if isinstance(nilai.dtype, pd.CategoricalDtype):
+                nilai = nilai.cat.set_categories(asal.categories)
+            kolom[col] = nilai.astype(asal)
+        elif col != 'Jumlah':
+            kolom[col] = cube[col].astype(object).where(cube[col].notna(), np.nan)
+    return cube.assign(**kolom)
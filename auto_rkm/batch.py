@@ -0,0 +1,64 @@
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from auto_rkm.agregasi import gabung_cube
+from auto_rkm.pembacaan import hash_isi, muat_cube
+
+def isi_upload(nama, isi_file):
+    # File .zip dibongkar menjadi daftar isi workbook .xlsx di dalamnya
+    if not nama.lower().endswith('.zip'):
+        return [isi_file]
+
+    daftar_isi = []
+    with zipfile.ZipFile(BytesIO(isi_file)) as arsip:
+        for info in arsip.infolist():
+            nama_file = os.path.basename(info.filename)
+            if info.is_dir() or nama_file.startswith(('~$', '.')) or not nama_file.lower().endswith('.xlsx'):
+                continue
+            daftar_isi.append(arsip.read(info))
+    return daftar_isi
+
+def hash_gabungan(daftar_hash):
+    # Urutan file ikut menentukan hash karena urutan rekap mengikuti urutan file
+    return hash_isi('\n'.join(daftar_hash).encode())
+
+def petakan_paralel(fungsi, daftar, max_workers=None):
+    # Dijalankan di process pool bila lebih dari satu item; hasil sesuai urutan input
+    if len(daftar) <= 1:
+        return [fungsi(item) for item in daftar]
+    max_workers = max_workers or min(len(daftar), os.cpu_count() or 1)
+    # Proses pekerja di-spawn, bukan fork: pool dibuat dari thread pekerja server
+    # Streamlit, dan fork saat thread lain memegang lock (misalnya lock
+    # CacheMemori) dapat membuat proses anak macet selamanya
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(fungsi, daftar))
+
+def muat_cube_parsial(isi_file):
+    # Cube per file tanpa normalisasi; bentuk baku dipilih setelah semua file digabung
+    return muat_cube(isi_file, normalisasi=False)
+
+def proses_banyak_file(daftar_isi, max_workers=None):
+    # Setiap workbook diparsing dan diringkas menjadi cube parsial di proses
+    # terpisah, lalu semua cube digabung sesuai urutan file
+    cubes = petakan_paralel(muat_cube_parsial, daftar_isi, max_workers)
+    if not cubes:
+        raise ValueError("Tidak ada file Excel (.xlsx) yang dapat diproses.")
+    return gabung_cube(cubes)
+
+def muat_cube_file(path):
+    # Dipakai CLI: file dibaca di proses pekerja sehingga isi file tidak perlu
+    # dikirim antar proses
+    with open(path, 'rb') as f:
+        daftar_isi = isi_upload(path, f.read())
+    if not daftar_isi:
+        return None
+    return gabung_cube([muat_cube_parsial(isi) for isi in daftar_isi], normalisasi=False)
+
+def proses_banyak_path(daftar_path, max_workers=None):
+    cubes = [c for c in petakan_paralel(muat_cube_file, daftar_path, max_workers) if c is not None]
+    if not cubes:
+        raise ValueError("Tidak ada file Excel (.xlsx) yang dapat diproses.")
+    return gabung_cube(cubes)
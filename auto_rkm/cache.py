@@ -0,0 +1,108 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Batas memori seluruh isi cache dalam satu proses (semua sesi/pengguna)
+BATAS_CACHE_MEMORI_MB = float(os.environ.get('AUTO_RKM_BATAS_CACHE_MEMORI_MB', '1024'))
+
+def perkiraan_ukuran(objek):
+    # Perkiraan byte sebuah hasil olahan: DataFrame, bytes, spec grafik (dict/list)
+    # dan objek dengan ukuran_memori() seperti IndeksTopik
+    if isinstance(objek, pd.DataFrame):
+        return int(objek.memory_usage(deep=True).sum())
+    if isinstance(objek, pd.Series):
+        return int(objek.memory_usage(deep=True))
+    if isinstance(objek, (bytes, bytearray, str)):
+        return sys.getsizeof(objek)
+    if isinstance(objek, dict):
+        return sys.getsizeof(objek) + sum(perkiraan_ukuran(k) + perkiraan_ukuran(v) for k, v in objek.items())
+    if isinstance(objek, (list, tuple, set)):
+        return sys.getsizeof(objek) + sum(perkiraan_ukuran(o) for o in objek)
+    if hasattr(objek, 'ukuran_memori'):
+        return objek.ukuran_memori()
+    return sys.getsizeof(objek)
+
+class CacheMemori:
+    # Cache LRU bersama untuk semua sesi dalam satu proses, dibatasi total memori.
+    # Kunci yang sama yang diminta bersamaan hanya dihitung sekali; permintaan
+    # lain menunggu hasilnya.
+
+    def __init__(self, batas_mb=BATAS_CACHE_MEMORI_MB):
+        self.batas_byte = int(batas_mb * 2**20)
+        self.isi = OrderedDict()
+        self.total_byte = 0
+        self.hit = 0
+        self.miss = 0
+        self.eviksi = 0
+        self.kunci_proses = {}
+        self.lock = threading.Lock()
+
+    def ambil(self, kunci, buat):
+        with self.lock:
+            if kunci in self.isi:
+                self.isi.move_to_end(kunci)
+                self.hit += 1
+                return self.isi[kunci][0]
+            lock_kunci = self.kunci_proses.setdefault(kunci, threading.Lock())
+
+        with lock_kunci:
+            with self.lock:
+                # Sudah dihitung oleh sesi lain selama menunggu
+                if kunci in self.isi:
+                    self.isi.move_to_end(kunci)
+                    self.hit += 1
+                    return self.isi[kunci][0]
+                self.miss += 1
+            try:
+                nilai = buat()
+                self.simpan(kunci, nilai)
+            finally:
+                with self.lock:
+                    self.kunci_proses.pop(kunci, None)
+        return nilai
+
+    def simpan(self, kunci, nilai):
+        ukuran = perkiraan_ukuran(nilai)
+        with self.lock:
+            if ukuran > self.batas_byte:
+                # Lebih besar dari seluruh anggaran: dipakai tanpa disimpan
+                self.eviksi += 1
+                return
+            if kunci in self.isi:
+                self.total_byte -= self.isi.pop(kunci)[1]
+            self.isi[kunci] = (nilai, ukuran)
+            self.total_byte += ukuran
+            while self.total_byte > self.batas_byte:
+                _, (_, ukuran_lama) = self.isi.popitem(last=False)
+                self.total_byte -= ukuran_lama
+                self.eviksi += 1
+
+    def bungkus(self, fungsi):
+        # Dekorator seperti st.cache_resource: argumen berawalan _ tidak ikut menjadi kunci
+        signature = inspect.signature(fungsi)
+
+        @functools.wraps(fungsi)
+        def pembungkus(*args, **kwargs):
+            argumen = signature.bind(*args, **kwargs)
+            argumen.apply_defaults()
+            kunci = (fungsi.__qualname__,) + tuple(
+                nilai for nama, nilai in argumen.arguments.items() if not nama.startswith('_')
+            )
+            return self.ambil(kunci, lambda: fungsi(*args, **kwargs))
+        return pembungkus
+
+    def statistik(self):
+        with self.lock:
+            return {
+                'entri': len(self.isi),
+                'mb': round(self.total_byte / 2**20, 2),
+                'batas_mb': round(self.batas_byte / 2**20, 2),
+                'hit': self.hit,
+                'miss': self.miss,
+                'eviksi': self.eviksi,
+            }
@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+import time
+
+from auto_rkm.agregasi import rekap_cube
+from auto_rkm.akumulasi import RekapKumulatif
+from auto_rkm.batch import proses_banyak_path
+from auto_rkm.ekspor import to_excel
+from auto_rkm.instrumentasi import LOG_TAHAP, Instrumentasi
+from auto_rkm.snapshot import EKSTENSI_SNAPSHOT, Snapshot
+
+def cari_file(daftar_input):
+    # Folder dibaca isinya (.xlsx dan .zip, urut nama); file disertakan apa adanya
+    daftar_path = []
+    for path in daftar_input:
+        if os.path.isdir(path):
+            for nama in sorted(os.listdir(path)):
+                if nama.lower().endswith(('.xlsx', '.zip')) and not nama.startswith('~$'):
+                    daftar_path.append(os.path.join(path, nama))
+        else:
+            daftar_path.append(path)
+    return daftar_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='auto-rkm',
+        description='Rekapitulasi Keluhan Masyarakat (RKM) dari file ekspor Excel tanpa Streamlit.'
+    )
+    parser.add_argument('input', nargs='+', help='folder atau file .xlsx/.zip')
+    parser.add_argument('-o', '--output', default='.', help='folder tujuan hasil rekap (default: folder saat ini)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='jumlah proses paralel (default: jumlah core)')
+    parser.add_argument('--log-tahap', default=LOG_TAHAP, help='tambahkan waktu setiap tahap sebagai JSON lines ke file ini')
+    parser.add_argument(
+        '--akumulasi', metavar='FOLDER',
+        help='tambahkan baris baru ke rekap kumulatif di folder ini (baris yang sudah pernah masuk dilewati, baris yang isinya berubah diperbarui)'
+    )
+    parser.add_argument(
+        '--snapshot', metavar='FILE',
+        help=f'simpan juga snapshot laporan (.{EKSTENSI_SNAPSHOT}) yang dapat dibuka di dashboard tanpa file Excel asli'
+    )
+    parser.add_argument('--waktu', action='store_true', help='tampilkan waktu setiap tahap setelah selesai')
+    args = parser.parse_args(argv)
+
+    daftar_path = cari_file(args.input)
+    if not daftar_path:
+        print("Error: tidak ada file .xlsx atau .zip yang ditemukan.", file=sys.stderr)
+        return 1
+    tidak_ada = [path for path in daftar_path if not os.path.isfile(path)]
+    if tidak_ada:
+        print(f"Error: file tidak ditemukan: {', '.join(tidak_ada)}", file=sys.stderr)
+        return 1
+
+    mulai = time.perf_counter()
+    instrumentasi = Instrumentasi(label='cli', log_path=args.log_tahap)
+    try:
+        if args.akumulasi:
+            with instrumentasi.ukur('akumulasi'), RekapKumulatif.dibuka(args.akumulasi) as state:
+                baru = state.tambah_path(daftar_path)
+                state.simpan()
+            if state.cube is None:
+                raise ValueError("Rekap kumulatif masih kosong.")
+            cube = state.cube
+            print(f"{baru} baris baru atau diperbarui; rekap kumulatif berisi {state.jumlah_baris} baris.")
+        else:
+            with instrumentasi.ukur('parse'):
+                cube = proses_banyak_path(daftar_path, max_workers=args.jobs)
+        with instrumentasi.ukur('AUTO_RKM'):
+            rkm, kategori = rekap_cube(cube)
+    except ValueError as ve:
+        print(f"Error: {ve}", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    with instrumentasi.ukur('ekspor'):
+        for nama_file, df in [('hasil_rkm.xlsx', rkm), ('kategori_keluhan.xlsx', kategori)]:
+            with open(os.path.join(args.output, nama_file), 'wb') as f:
+                f.write(to_excel(df))
+
+    if args.snapshot:
+        try:
+            with instrumentasi.ukur('snapshot'):
+                Snapshot.dari_cube(cube, rkm, kategori, label=', '.join(daftar_path)).simpan(args.snapshot)
+        except ValueError as ve:
+            print(f"Error: {ve}", file=sys.stderr)
+            return 1
+
+    if args.waktu:
+        print(instrumentasi.tabel().to_string(index=False))
+
+    print(
+        f"{len(daftar_path)} file diproses dalam {time.perf_counter() - mulai:.1f} detik: "
+        f"{len(rkm)} instansi, {int(rkm['Jumlah'].sum())} keluhan selesai. "
+        f"Hasil ditulis ke {os.path.abspath(args.output)}"
+    )
+    return 0
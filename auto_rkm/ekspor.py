@@ -0,0 +1,61 @@
+import zipfile
+from io import BytesIO
+
+import xlsxwriter
+
+MIME_EKSPOR = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'application/zip',
+    'parquet': 'application/zip',
+}
+# Jumlah baris yang dikonversi sekaligus saat menulis workbook
+UKURAN_CHUNK_EKSPOR = 10_000
+
+def tulis_workbook(tabel):
+    # tabel: {nama sheet: DataFrame}. Mode constant_memory xlsxwriter menulis baris
+    # berurutan dan langsung mem-flush-nya, sehingga memori tidak ikut membesar
+    # seiring jumlah baris
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'nan_inf_to_errors': True,
+        'default_date_format': 'yyyy-mm-dd',
+    })
+    for nama, df in tabel.items():
+        worksheet = workbook.add_worksheet(nama[:31])
+        worksheet.write_row(0, 0, [str(col) for col in df.columns])
+        baris = 1
+        for mulai in range(0, len(df), UKURAN_CHUNK_EKSPOR):
+            chunk = df.iloc[mulai:mulai + UKURAN_CHUNK_EKSPOR]
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            for row in chunk.itertuples(index=False, name=None):
+                worksheet.write_row(baris, 0, row)
+                baris += 1
+    workbook.close()
+    return output.getvalue()
+
+def nama_file_tabel(nama):
+    return nama.lower().replace(' ', '_')
+
+def tulis_zip(tabel, format):
+    output = BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as arsip:
+        for nama, df in tabel.items():
+            if format == 'csv':
+                arsip.writestr(f'{nama_file_tabel(nama)}.csv', df.to_csv(index=False))
+            else:
+                # Parquet sudah terkompresi, tidak perlu dikompresi ulang oleh zip
+                buffer = BytesIO()
+                df.to_parquet(buffer, index=False)
+                arsip.writestr(f'{nama_file_tabel(nama)}.parquet', buffer.getvalue(), zipfile.ZIP_STORED)
+    return output.getvalue()
+
+def ekspor(tabel, format='xlsx'):
+    if format not in MIME_EKSPOR:
+        raise ValueError(f"Format ekspor tidak dikenal: {format}")
+    if format == 'xlsx':
+        return tulis_workbook(tabel)
+    return tulis_zip(tabel, format)
+
+def to_excel(df):
+    return tulis_workbook({'Sheet1': df})
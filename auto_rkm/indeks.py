@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+from auto_rkm.agregasi import AWALAN_OPD, daftar_opd
+
+# Dimensi cube yang dapat difilter di dashboard selain rentang tanggal
+DIMENSI_FILTER = ['Kategori', 'Channel', 'Instansi']
+# Kolom yang dibutuhkan indeks drill-down OPD (hanya untuk grafik, bukan rekap)
+KOLOM_INDEKS = {'Kategori', 'Status', 'Instansi', 'Topik'}
+# Nama tabel IndeksTopik saat disimpan (snapshot)
+TABEL_INDEKS = ['Indeks Topik', 'Indeks Instansi', 'Daftar OPD']
+
+class IndeksTopik:
+    # Jumlah Topik per (Kategori, Instansi) untuk keluhan Selesai, dibangun sekali
+    # per dataset sehingga memilih instansi di drill-down cukup satu lookup dict
+
+    def __init__(self, per_topik, per_instansi, opd):
+        # per_topik: (Kategori, Instansi, Topik, Jumlah) dan per_instansi:
+        # (Kategori, Instansi, Jumlah), keduanya urut jumlah terbanyak
+        self.per_topik = per_topik
+        self.per_instansi = per_instansi
+        self.opd = opd
+        # Posisi baris per grup saja, bukan satu DataFrame per pasangan (Kategori, Instansi)
+        self.topik = per_topik[['Topik', 'Jumlah']]
+        self.posisi_topik = per_topik.groupby(['Kategori', 'Instansi'], sort=False, observed=True).indices
+        self.instansi = {
+            kategori: grup[['Instansi', 'Jumlah']].reset_index(drop=True)
+            for kategori, grup in per_instansi.groupby('Kategori', sort=False, observed=True)
+        }
+
+    @classmethod
+    def kosong(cls):
+        # Untuk data tanpa kolom grafik (misalnya snapshot file yang hanya berisi kolom wajib)
+        per_topik = pd.DataFrame({col: pd.Series(dtype=object) for col in ['Kategori', 'Instansi', 'Topik']})
+        per_instansi = pd.DataFrame({col: pd.Series(dtype=object) for col in ['Kategori', 'Instansi']})
+        return cls(per_topik.assign(Jumlah=0), per_instansi.assign(Jumlah=0), set())
+
+    @classmethod
+    def dari_cube(cls, cube, awalan=AWALAN_OPD):
+        if not KOLOM_INDEKS.issubset(cube.columns):
+            raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {KOLOM_INDEKS}")
+
+        selesai = cube[cube['Status'] == 'Selesai']
+        selesai = selesai[selesai['Kategori'].notna() & selesai['Instansi'].notna()]
+        opd = daftar_opd(selesai['Instansi'], awalan)
+
+        per_topik = selesai.groupby(['Kategori', 'Instansi', 'Topik'], sort=False, observed=True)['Jumlah'].sum()
+        per_topik = per_topik.sort_values(ascending=False, kind='stable').reset_index()
+
+        per_instansi = selesai.groupby(['Kategori', 'Instansi'], sort=False, observed=True)['Jumlah'].sum()
+        # Sort stabil seperti count_by: jumlah yang sama tetap urut kemunculan pertama
+        # sehingga 5 OPD teratas sama dengan tabel OPD di file unduhan dan snapshot
+        per_instansi = per_instansi.sort_values(ascending=False, kind='stable').reset_index()
+        return cls(per_topik, per_instansi, opd)
+
+    def ke_tabel(self):
+        # Bentuk tabel untuk disimpan (snapshot); dibaca kembali dengan dari_tabel
+        topik, instansi, opd = TABEL_INDEKS
+        return {
+            topik: self.per_topik,
+            instansi: self.per_instansi,
+            opd: pd.DataFrame({'Instansi': sorted(self.opd, key=str)}),
+        }
+
+    @classmethod
+    def dari_tabel(cls, tabel):
+        topik, instansi, opd = TABEL_INDEKS
+        return cls(tabel[topik], tabel[instansi], set(tabel[opd]['Instansi']))
+
+    @property
+    def ada_data(self):
+        return not (self.per_topik.empty and self.per_instansi.empty)
+
+    def daftar_instansi(self, kategori, hanya_opd=True, top_n=None):
+        # Instansi urut jumlah terbanyak; hanya_opd memakai flag OPD yang sudah dihitung
+        df = self.instansi.get(kategori)
+        if df is None:
+            return pd.DataFrame(columns=['Instansi', 'Jumlah'])
+        if hanya_opd:
+            df = df[df['Instansi'].isin(self.opd)].reset_index(drop=True)
+        return df if top_n is None else df.head(top_n)
+
+    def topik_instansi(self, kategori, instansi):
+        posisi = self.posisi_topik.get((kategori, instansi))
+        if posisi is None:
+            return pd.DataFrame(columns=['Topik', 'Jumlah'])
+        return self.topik.iloc[posisi].reset_index(drop=True)
+
+    def ukuran_memori(self):
+        # Kategori Topik/Instansi dipakai bersama dengan cube sehingga yang
+        # dihitung hanya kode dan jumlahnya
+        tabel = [self.per_topik, self.per_instansi] + list(self.instansi.values())
+        return sum(posisi.nbytes for posisi in self.posisi_topik.values()) + sum(
+            df[col].cat.codes.nbytes if isinstance(df[col].dtype, pd.CategoricalDtype)
+            else df[col].memory_usage(index=False, deep=True)
+            for df in tabel for col in df.columns
+        )
+
+class IndeksFilter:
+    # Indeks baris cube untuk panel filter, dibangun sekali per dataset: urutan
+    # baris menurut tanggal (untuk rentang tanggal lewat pencarian biner) dan
+    # kode kategori per dimensi. Setiap perubahan filter cukup menggabungkan
+    # mask numpy lalu mengambil baris cube yang lolos, tanpa memindai data mentah.
+    # Cube sendiri tidak disimpan agar indeks di cache tidak menahan cube yang
+    # sudah dieviksi; cube diberikan lagi saat menyaring.
+
+    def __init__(self, cube):
+        self.jumlah_baris = len(cube)
+        self.kode = {}
+        self.nilai = {}
+        for dim in DIMENSI_FILTER:
+            if dim in cube.columns:
+                kolom = cube[dim].astype('category')
+                self.kode[dim] = kolom.cat.codes.to_numpy()
+                self.nilai[dim] = kolom.cat.categories
+
+        self.urutan_tanggal = None
+        if 'Tanggal Keluhan' in cube.columns:
+            tanggal = cube['Tanggal Keluhan'].to_numpy()
+            # NaT diletakkan di akhir oleh argsort dan tidak ikut rentang mana pun
+            self.urutan_tanggal = np.argsort(tanggal, kind='stable')
+            self.tanggal_urut = tanggal[self.urutan_tanggal]
+            self.jumlah_tanggal = int((~np.isnat(self.tanggal_urut)).sum())
+
+    @classmethod
+    def dari_cube(cls, cube):
+        return cls(cube)
+
+    def rentang_tanggal(self):
+        if self.urutan_tanggal is None or not self.jumlah_tanggal:
+            return None
+        return (
+            pd.Timestamp(self.tanggal_urut[0]).date(),
+            pd.Timestamp(self.tanggal_urut[self.jumlah_tanggal - 1]).date(),
+        )
+
+    def pilihan(self, dim):
+        # Nilai yang benar-benar muncul pada cube, urut abjad
+        if dim not in self.kode:
+            return []
+        kode = np.unique(self.kode[dim])
+        return sorted(self.nilai[dim][kode[kode >= 0]], key=str)
+
+    def mask(self, tanggal=None, nilai=None):
+        # tanggal: (awal, akhir) inklusif; nilai: {dimensi: daftar nilai}.
+        # Filter yang kosong/None tidak membatasi apa pun.
+        mask = np.ones(self.jumlah_baris, dtype=bool)
+        if tanggal is not None and self.urutan_tanggal is not None:
+            awal, akhir = (np.datetime64(pd.Timestamp(t)).astype(self.tanggal_urut.dtype) for t in tanggal)
+            tanggal_urut = self.tanggal_urut[:self.jumlah_tanggal]
+            kiri = np.searchsorted(tanggal_urut, awal, side='left')
+            kanan = np.searchsorted(tanggal_urut, akhir, side='right')
+            mask[:] = False
+            mask[self.urutan_tanggal[kiri:kanan]] = True
+
+        for dim, dipilih_dim in (nilai or {}).items():
+            if not dipilih_dim or dim not in self.kode:
+                continue
+            # Tabel lookup per kode kategori; indeks terakhir untuk NaN (kode -1)
+            dipilih = np.zeros(len(self.nilai[dim]) + 1, dtype=bool)
+            posisi = self.nilai[dim].get_indexer(list(dipilih_dim))
+            dipilih[posisi[posisi >= 0]] = True
+            mask &= dipilih[self.kode[dim]]
+        return mask
+
+    def saring(self, cube, tanggal=None, nilai=None):
+        # cube: cube yang sama dengan saat indeks dibangun
+        if len(cube) != self.jumlah_baris:
+            raise ValueError("Cube tidak sesuai dengan indeks filter.")
+        mask = self.mask(tanggal, nilai)
+        if mask.all():
+            return cube
+        return cube.iloc[np.flatnonzero(mask)].reset_index(drop=True)
+
+    def ukuran_memori(self):
+        ukuran = sum(kode.nbytes for kode in self.kode.values())
+        if self.urutan_tanggal is not None:
+            ukuran += self.urutan_tanggal.nbytes + self.tanggal_urut.nbytes
+        return ukuran
@@ -0,0 +1,94 @@
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+# Bila diisi, setiap tahap yang selesai ditambahkan sebagai satu baris JSON ke file ini
+LOG_TAHAP = os.environ.get('AUTO_RKM_LOG_TAHAP')
+# Jumlah catatan tahap terakhir yang disimpan di memori
+MAKS_CATATAN_TAHAP = 500
+
+def rss_mb():
+    # Memori proses saat ini: psutil bila terpasang, /proc di Linux, selain itu None
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class Instrumentasi:
+    # Mencatat durasi dan perubahan memori setiap tahap pipeline (parse, validasi,
+    # AUTO_RKM, grafik, ekspor)
+
+    def __init__(self, label=None, log_path=LOG_TAHAP):
+        self.label = label
+        self.log_path = log_path
+        self.tahap = deque(maxlen=MAKS_CATATAN_TAHAP)
+
+    @contextmanager
+    def ukur(self, nama):
+        rss_awal = rss_mb()
+        mulai = time.perf_counter()
+        status = 'gagal'
+        try:
+            yield
+            status = 'ok'
+        finally:
+            rss_akhir = rss_mb()
+            catatan = {
+                'label': self.label,
+                'tahap': nama,
+                'waktu': datetime.now().isoformat(timespec='seconds'),
+                'detik': round(time.perf_counter() - mulai, 4),
+                'rss_mb': None if rss_akhir is None else round(rss_akhir, 1),
+                'delta_rss_mb': None if None in (rss_awal, rss_akhir) else round(rss_akhir - rss_awal, 1),
+                'status': status,
+            }
+            self.tahap.append(catatan)
+            if self.log_path:
+                self.tulis_log(catatan)
+
+    def tulis_log(self, catatan):
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(catatan) + '\n')
+
+    def tabel(self):
+        return pd.DataFrame(list(self.tahap), columns=['tahap', 'detik', 'rss_mb', 'delta_rss_mb', 'status', 'waktu'])
+
+    def ke_json(self):
+        return json.dumps(list(self.tahap), indent=2)
+
+def ukuran_mb(objek):
+    # DataFrame dihitung deep (termasuk isi string); objek lain lewat ukuran_memori()
+    if isinstance(objek, pd.DataFrame):
+        return objek.memory_usage(deep=True).sum() / 2**20
+    return objek.ukuran_memori() / 2**20
+
+def laporan_memori(data):
+    # Rincian memori per kolom: tipe, jumlah nilai unik dan MB
+    return pd.DataFrame([
+        {
+            'kolom': col,
+            'tipe': str(data[col].dtype),
+            'unik': data[col].nunique(dropna=False),
+            'mb': round(data[col].memory_usage(deep=True, index=False) / 2**20, 3),
+        }
+        for col in data.columns
+    ], columns=['kolom', 'tipe', 'unik', 'mb'])
+
+def ringkasan_memori(objek):
+    # objek: {nama: DataFrame atau objek dengan ukuran_memori()}; None dilewati
+    return pd.DataFrame([
+        {'objek': nama, 'baris': len(o) if isinstance(o, pd.DataFrame) else None, 'mb': round(ukuran_mb(o), 3)}
+        for nama, o in objek.items() if o is not None
+    ], columns=['objek', 'baris', 'mb']).astype({'baris': 'Int64'})
+
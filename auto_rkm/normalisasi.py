@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# Normalisasi teks Topik, Instansi dan nama lokasi; AUTO_RKM_NORMALISASI=0 mematikannya
+NORMALISASI = os.environ.get('AUTO_RKM_NORMALISASI', '1') != '0'
+# Kolom yang dinormalisasi. Status, Kategori dan Channel tidak disentuh karena
+# nilainya dibandingkan langsung (misalnya Status == 'Selesai').
+KOLOM_NORMALISASI = ['Instansi', 'Topik', 'Kecamatan', 'Kelurahan']
+# Opsional: file peta bentuk baku yang dipakai ulang lintas run. Tanpa peta,
+# bentuk baku dipilih dari data yang sedang direkap (varian terbanyak) sehingga
+# AUTO_RKM(df) tetap fungsi murni tanpa efek samping ke disk.
+PATH_PETA_NORMALISASI = os.environ.get('AUTO_RKM_PETA_NORMALISASI') or None
+# Jumlah teks asli yang hasil pembersihannya disimpan di memori proses
+MAKS_CACHE_TEKS = int(os.environ.get('AUTO_RKM_MAKS_CACHE_TEKS', '200000'))
+
+class PetaNormalisasi:
+    # {kolom: {kunci: bentuk baku}}; kunci = teks huruf kecil dengan spasi dirapikan.
+    # Bentuk baku yang pertama kali dipilih tetap dipakai pada upload berikutnya
+    # sehingga rekap kumulatif dan rekap beberapa file selalu konsisten.
+
+    def __init__(self, path=PATH_PETA_NORMALISASI):
+        self.path = path
+        self.peta = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.peta = json.load(f)
+            except (OSError, ValueError):
+                self.peta = {}
+
+    def pilih(self, kolom, calon):
+        # calon: {kunci: bentuk baku usulan}; kunci yang sudah ada di peta tidak berubah
+        with self.lock:
+            peta_kolom = self.peta.setdefault(kolom, {})
+            baru = {kunci: nilai for kunci, nilai in calon.items() if kunci not in peta_kolom}
+            peta_kolom.update(baru)
+            hasil = {kunci: peta_kolom[kunci] for kunci in calon}
+            if baru:
+                self.simpan()
+        return hasil
+
+    def simpan(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # Peta di disk mungkin sudah ditambah proses lain; isinya digabung lebih dulu
+            if os.path.exists(self.path):
+                with open(self.path, encoding='utf-8') as f:
+                    for kolom, peta_kolom in json.load(f).items():
+                        for kunci, nilai in peta_kolom.items():
+                            self.peta.setdefault(kolom, {}).setdefault(kunci, nilai)
+            path_tmp = f'{self.path}.{uuid.uuid4().hex}.tmp'
+            with open(path_tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.peta, f, ensure_ascii=False)
+            os.replace(path_tmp, self.path)
+        except (OSError, ValueError):
+            # Peta tetap dipakai di memori walaupun gagal disimpan
+            pass
+
+_peta_bersama = None
+_lock_peta = threading.Lock()
+
+def peta_bersama():
+    global _peta_bersama
+    if not PATH_PETA_NORMALISASI:
+        return None
+    with _lock_peta:
+        if _peta_bersama is None:
+            _peta_bersama = PetaNormalisasi()
+        return _peta_bersama
+
+class CacheTeks:
+    # Hasil pembersihan per teks asli: {teks: (bersih, kunci)}. Dipakai bersama
+    # oleh semua sesi dan rerun dalam satu proses sehingga kategori yang sudah
+    # pernah dilihat (nama Instansi/Topik yang sama setiap hari) tidak diproses
+    # ulang dengan operasi string. Bila penuh, isinya dikosongkan.
+
+    def __init__(self, maks_entri=MAKS_CACHE_TEKS):
+        self.maks_entri = maks_entri
+        self.isi = {}
+        self.lock = threading.Lock()
+
+    def ambil(self, daftar_teks):
+        with self.lock:
+            return [self.isi.get(teks) for teks in daftar_teks]
+
+    def simpan(self, daftar_teks, bersih, kunci):
+        with self.lock:
+            if len(self.isi) + len(daftar_teks) > self.maks_entri:
+                self.isi.clear()
+            self.isi.update(zip(daftar_teks, zip(bersih, kunci)))
+
+cache_teks = CacheTeks()
+
+def bersihkan_teks(kategori):
+    # Spasi di awal/akhir dibuang dan spasi ganda dirapikan; nilai bukan teks dibiarkan.
+    # Hanya teks yang belum ada di cache_teks yang diproses dengan operasi string vektor.
+    nilai = pd.Series(kategori, dtype=object)
+    teks = nilai.map(lambda x: isinstance(x, str)).to_numpy(dtype=bool)
+    bersih = nilai.copy()
+    kunci = nilai.copy()
+    if not teks.any():
+        return bersih, kunci, teks
+
+    posisi = np.flatnonzero(teks)
+    tersimpan = cache_teks.ambil(nilai.iloc[posisi])
+    dikenal = np.array([h is not None for h in tersimpan], dtype=bool)
+    if dikenal.any():
+        bersih.iloc[posisi[dikenal]] = [h[0] for h in tersimpan if h is not None]
+        kunci.iloc[posisi[dikenal]] = [h[1] for h in tersimpan if h is not None]
+    if not dikenal.all():
+        baru = posisi[~dikenal]
+        hasil = nilai.iloc[baru].str.replace(r'\s+', ' ', regex=True).str.strip()
+        bersih.iloc[baru] = hasil.to_numpy()
+        kunci.iloc[baru] = hasil.str.casefold().to_numpy()
+        cache_teks.simpan(nilai.iloc[baru], bersih.iloc[baru], kunci.iloc[baru])
+    return bersih, kunci, teks
+
+def normalisasi_kolom(nilai, kolom, bobot=None, peta=None):
+    # nilai: Series category. Hanya kategori unik yang diproses dengan operasi
+    # string vektor; kode setiap baris lalu dipetakan ulang sekali lewat numpy.
+    # Varian yang hanya berbeda huruf besar/kecil atau spasi digabung ke bentuk
+    # dengan bobot (jumlah) terbesar pada data ini, atau bentuk yang tersimpan di
+    # peta bila peta lintas run diaktifkan.
+    kategori = nilai.cat.categories
+    bersih, kunci, teks = bersihkan_teks(kategori)
+    if not teks.any():
+        return nilai
+
+    kode = nilai.cat.codes.to_numpy()
+    if bobot is None:
+        bobot = np.ones(len(kode))
+    total = np.bincount(kode[kode >= 0], weights=np.asarray(bobot)[kode >= 0], minlength=len(kategori))
+
+    calon = (
+        pd.DataFrame({'kunci': kunci[teks], 'bersih': bersih[teks], 'total': total[teks]})
+        .sort_values('total', ascending=False, kind='stable')
+        .drop_duplicates('kunci')
+    )
+    calon = calon[calon['kunci'] != '']
+    baku = dict(zip(calon['kunci'], calon['bersih']))
+    peta = peta or peta_bersama()
+    if peta is not None:
+        baku = peta.pilih(kolom, baku)
+
+    hasil = bersih.copy()
+    hasil[teks] = kunci[teks].map(baku)
+    # Teks kosong setelah dibersihkan dianggap tidak diisi
+    hasil[teks & (bersih == '').to_numpy()] = np.nan
+    if hasil.equals(pd.Series(kategori, dtype=object)):
+        return nilai
+
+    kategori_baru = pd.Index(hasil.dropna().unique())
+    peta_kode = np.append(kategori_baru.get_indexer(hasil), -1)
+    return pd.Series(
+        pd.Categorical.from_codes(peta_kode[kode], categories=kategori_baru),
+        index=nilai.index,
+        name=nilai.name,
+    )
+
+def normalisasi_cube(cube, kolom=KOLOM_NORMALISASI, peta=None):
+    # Dijalankan pada cube (satu baris per kombinasi), bukan pada data mentah.
+    # Kombinasi yang menjadi sama setelah normalisasi dijumlahkan kembali.
+    if not NORMALISASI:
+        return cube
+    kolom_baru = {}
+    for col in kolom:
+        if col in cube.columns and isinstance(cube[col].dtype, pd.CategoricalDtype):
+            asli = cube[col]
+            hasil = normalisasi_kolom(asli, col, cube['Jumlah'].to_numpy(), peta)
+            if hasil is not asli:
+                kolom_baru[col] = hasil
+    if not kolom_baru:
+        return cube
+
+    cube = cube.assign(**kolom_baru)
+    dims = [col for col in cube.columns if col != 'Jumlah']
+    if not cube.duplicated(dims).any():
+        return cube
+    tipe_jumlah = cube['Jumlah'].dtype
+    cube = cube.groupby(dims, sort=False, dropna=False, observed=True)['Jumlah'].sum().reset_index()
+    return cube.assign(Jumlah=cube['Jumlah'].astype(tipe_jumlah))
@@ -0,0 +1,63 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+# Jumlah upload yang diproses bersamaan; pekerjaan lain menunggu di antrean
+MAKS_PEKERJAAN = int(os.environ.get('AUTO_RKM_MAKS_PEKERJAAN', '2'))
+
+class Pekerjaan:
+    # Satu upload yang diproses di latar belakang sebagai urutan tahap. Hasil
+    # setiap tahap langsung tersedia di self.hasil sehingga halaman dapat
+    # menampilkan sebagian hasil (misalnya rekap sebelum grafik).
+
+    def __init__(self, label, tahap, instrumentasi=None):
+        self.label = label
+        # tahap: list (nama, fungsi(hasil) -> nilai), dijalankan berurutan
+        self.tahap = tahap
+        self.instrumentasi = instrumentasi
+        self.hasil = {}
+        self.error = None
+        self.tahap_aktif = None
+        self.future = None
+        self.dibatalkan = threading.Event()
+
+    def jalankan(self):
+        for nama, fungsi in self.tahap:
+            # Tahap yang sedang berjalan tidak dapat dihentikan; pembatalan
+            # berlaku mulai tahap berikutnya
+            if self.dibatalkan.is_set():
+                return
+            self.tahap_aktif = nama
+            try:
+                with self.instrumentasi.ukur(nama) if self.instrumentasi else nullcontext():
+                    self.hasil[nama] = fungsi(self.hasil)
+            except Exception as e:
+                self.error = e
+                return
+        self.tahap_aktif = None
+
+    def batal(self):
+        self.dibatalkan.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def selesai(self):
+        return self.future is not None and self.future.done()
+
+    @property
+    def progres(self):
+        return len(self.hasil) / len(self.tahap) if self.tahap else 1.0
+
+class AntreanPekerjaan:
+    # Thread pool kecil bersama untuk semua sesi; parse beberapa file tetap
+    # memakai process pool di dalam tahapnya sendiri
+
+    def __init__(self, max_workers=MAKS_PEKERJAAN):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='auto-rkm')
+
+    def kirim(self, label, tahap, instrumentasi=None):
+        pekerjaan = Pekerjaan(label, tahap, instrumentasi)
+        pekerjaan.future = self.pool.submit(pekerjaan.jalankan)
+        return pekerjaan
@@ -0,0 +1,327 @@
+import hashlib
+import importlib.util
+import json
+import os
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+
+from auto_rkm.agregasi import CUBE_DIMS, GabunganCube, buat_cube, padatkan_cube, validasi_kolom
+
+# File yang lebih besar dari batas ini diproses per batch baris (mode streaming)
+BATAS_STREAMING_MB = float(os.environ.get('AUTO_RKM_BATAS_STREAMING_MB', '100'))
+UKURAN_BATCH_STREAMING = 50_000
+
+# Cache Parquet hasil konversi upload, dipakai ulang lintas sesi berdasarkan hash isi file
+CACHE_DIR = os.environ.get('AUTO_RKM_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'auto-rkm'))
+BATAS_CACHE_PARQUET_MB = float(os.environ.get('AUTO_RKM_BATAS_CACHE_MB', '2048'))
+
+# Hanya kolom ini yang dibaca dari file ekspor; kolom lain dilewati saat parsing
+KOLOM_DIPAKAI = ['Instansi', 'Topik', 'Channel', 'Status', 'Kecamatan', 'Kelurahan', 'Kategori', 'Tanggal Keluhan']
+# Nama kolom alternatif pada file ekspor -> nama baku. Tambahan dapat diberikan
+# lewat AUTO_RKM_ALIAS_KOLOM, misalnya "Tgl Keluhan=Tanggal Keluhan,Nama OPD=Instansi"
+ALIAS_KOLOM = {
+    'Tgl Keluhan': 'Tanggal Keluhan',
+    **{
+        lama.strip(): baru.strip()
+        for lama, _, baru in (
+            pasangan.partition('=') for pasangan in os.environ.get('AUTO_RKM_ALIAS_KOLOM', '').split(',')
+        )
+        if lama.strip() and baru.strip()
+    },
+}
+# Kolom teks berkardinalitas rendah yang disimpan sebagai category
+KOLOM_KATEGORI = ['Instansi', 'Topik', 'Channel', 'Status', 'Kecamatan', 'Kelurahan', 'Kategori']
+
+def engine_excel():
+    # Pembaca calamine (Rust) jauh lebih cepat dari openpyxl, didukung pandas >= 2.2
+    versi_pandas = tuple(int(v) for v in pd.__version__.split('.')[:2])
+    if versi_pandas >= (2, 2) and importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    return 'openpyxl'
+
+def siapkan_tipe(data):
+    if 'Tanggal Keluhan' in data.columns:
+        data['Tanggal Keluhan'] = pd.to_datetime(data['Tanggal Keluhan'], errors='coerce')
+    for col in KOLOM_KATEGORI:
+        if col in data.columns:
+            data[col] = data[col].astype('category')
+    return data
+
+def nama_tag(elem):
+    # Nama tag XML tanpa namespace (OOXML transitional maupun strict)
+    return elem.tag.rpartition('}')[2]
+
+def path_sheet_pertama(arsip):
+    workbook = ET.fromstring(arsip.read('xl/workbook.xml'))
+    sheet = next(elem for elem in workbook.iter() if nama_tag(elem) == 'sheet')
+    rid = next(nilai for kunci, nilai in sheet.attrib.items() if kunci.endswith('}id'))
+    rels = ET.fromstring(arsip.read('xl/_rels/workbook.xml.rels'))
+    target = next(rel.get('Target') for rel in rels if rel.get('Id') == rid)
+    return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+
+def indeks_kolom(referensi):
+    # 'AB1' -> 27
+    indeks = 0
+    for huruf in referensi.rstrip('0123456789'):
+        indeks = indeks * 26 + ord(huruf.upper()) - ord('A') + 1
+    return indeks - 1
+
+def teks_sel(elem):
+    return ''.join(t.text or '' for t in elem.iter() if nama_tag(t) == 't')
+
+def baca_shared_strings(arsip, jumlah):
+    # Hanya `jumlah` string pertama yang dibaca; tabel shared strings file ekspor
+    # bisa sangat besar karena berisi teks keluhan
+    hasil = []
+    if jumlah <= 0 or 'xl/sharedStrings.xml' not in arsip.namelist():
+        return hasil
+    with arsip.open('xl/sharedStrings.xml') as f:
+        for _, elem in ET.iterparse(f):
+            if nama_tag(elem) == 'si':
+                hasil.append(teks_sel(elem))
+                elem.clear()
+                if len(hasil) >= jumlah:
+                    break
+    return hasil
+
+def baca_header(sumber):
+    # Hanya baris pertama sheet pertama yang dibaca langsung dari XML workbook,
+    # tanpa parse isi sheet. openpyxl read-only tetap memuat seluruh tabel shared
+    # strings sehingga lambat untuk file besar.
+    with zipfile.ZipFile(sumber) as arsip:
+        sel = {}
+        with arsip.open(path_sheet_pertama(arsip)) as f:
+            for _, elem in ET.iterparse(f):
+                tag = nama_tag(elem)
+                if tag == 'c':
+                    referensi = elem.get('r')
+                    sel[indeks_kolom(referensi) if referensi else len(sel)] = elem
+                elif tag == 'row':
+                    break
+
+        nilai = {}
+        for i, elem in sel.items():
+            jenis = elem.get('t')
+            v = next((anak.text for anak in elem if nama_tag(anak) == 'v'), None)
+            if jenis == 's' and v is not None:
+                nilai[i] = int(v)
+            elif jenis == 'inlineStr':
+                nilai[i] = teks_sel(elem)
+            elif v is not None and jenis in (None, 'n'):
+                angka = float(v)
+                nilai[i] = int(angka) if angka.is_integer() else angka
+            else:
+                nilai[i] = v
+
+        indeks_string = [nilai[i] for i, elem in sel.items() if elem.get('t') == 's' and i in nilai]
+        shared = baca_shared_strings(arsip, max(indeks_string, default=-1) + 1)
+        for i, elem in sel.items():
+            if elem.get('t') == 's' and i in nilai:
+                nilai[i] = shared[nilai[i]]
+
+    if hasattr(sumber, 'seek'):
+        sumber.seek(0)
+    return [nilai.get(i) for i in range(max(nilai, default=-1) + 1)]
+
+def petakan_kolom(header, kolom=KOLOM_DIPAKAI, alias=None):
+    # Nama kolom di file -> nama baku setelah spasi dibuang dan alias diterapkan.
+    # kolom=None memetakan semua kolom; bila dua kolom bernama sama, yang pertama dipakai.
+    alias = ALIAS_KOLOM if alias is None else alias
+    pemetaan = {}
+    for col in header:
+        if col is None or col in pemetaan:
+            continue
+        nama = alias.get(str(col).strip(), str(col).strip())
+        if (kolom is None or nama in kolom) and nama not in pemetaan.values():
+            pemetaan[col] = nama
+    return pemetaan
+
+def periksa_header(sumber, kolom=KOLOM_DIPAKAI):
+    # File tanpa kolom wajib ditolak sebelum seluruh workbook diparsing
+    pemetaan = petakan_kolom(baca_header(sumber), kolom)
+    validasi_kolom(pemetaan.values())
+    return pemetaan
+
+def baca_excel(sumber, engine=None, kolom=KOLOM_DIPAKAI):
+    # kolom=None membaca semua kolom (dipakai untuk hash baris pada rekap kumulatif)
+    pemetaan = periksa_header(sumber, kolom)
+    data = pd.read_excel(
+        sumber,
+        usecols=None if kolom is None else lambda col: col in pemetaan,
+        engine=engine or engine_excel()
+    )
+    return siapkan_tipe(data.rename(columns=pemetaan))
+
+def iter_batch_excel(sumber, ukuran_batch=UKURAN_BATCH_STREAMING):
+    import openpyxl
+
+    # Sheet dibaca baris demi baris dengan openpyxl read-only sehingga seluruh
+    # sheet tidak pernah ada di memori; hanya satu batch yang dipegang sekaligus.
+    # Header diperiksa lebih dulu karena memuat workbook sudah membaca seluruh
+    # tabel shared strings.
+    periksa_header(sumber)
+    wb = openpyxl.load_workbook(sumber, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, ())
+        pemetaan = petakan_kolom(header)
+        posisi = {}
+        for i, col in enumerate(header):
+            if col in pemetaan:
+                posisi.setdefault(pemetaan[col], i)
+        kolom = list(posisi)
+
+        batch = []
+        for row in rows:
+            nilai = [row[i] if i < len(row) else None for i in posisi.values()]
+            if all(v is None for v in nilai):
+                continue
+            batch.append(nilai)
+            if len(batch) >= ukuran_batch:
+                yield pd.DataFrame(batch, columns=kolom)
+                batch = []
+        yield pd.DataFrame(batch, columns=kolom)
+    finally:
+        wb.close()
+
+def baca_excel_streaming(sumber, ukuran_batch=UKURAN_BATCH_STREAMING, path_parquet=None, normalisasi=True):
+    # Setiap batch langsung diringkas menjadi cube parsial lalu digabung
+    # bertingkat; bila path_parquet diisi, batch juga ditulis ke cache Parquet
+    gabungan = GabunganCube()
+    writer = None
+    tmp = f'{path_parquet}.tmp' if path_parquet else None
+    try:
+        for batch in iter_batch_excel(sumber, ukuran_batch):
+            gabungan.tambah(buat_cube(batch, normalisasi=False))
+            if tmp:
+                writer = tulis_batch_parquet(writer, batch, tmp)
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp, path_parquet)
+    finally:
+        if writer is not None:
+            writer.close()
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+    return gabungan.hasil(normalisasi)
+
+def parquet_tersedia():
+    return importlib.util.find_spec('pyarrow') is not None
+
+def versi_proyeksi(kolom=KOLOM_DIPAKAI, alias=None):
+    # Isi cache Parquet bergantung pada kolom yang dibaca dan alias nama kolom;
+    # alias baru membuat file lama tidak dipakai lagi (lalu tereviksi LRU)
+    alias = ALIAS_KOLOM if alias is None else alias
+    konfigurasi = json.dumps([list(kolom), sorted(alias.items())], ensure_ascii=False)
+    return hashlib.sha256(konfigurasi.encode()).hexdigest()[:12]
+
+def path_parquet(file_hash):
+    return os.path.join(CACHE_DIR, f'{file_hash}-{versi_proyeksi()}.parquet')
+
+def ada_cache_parquet(file_hash):
+    return parquet_tersedia() and os.path.exists(path_parquet(file_hash))
+
+def tulis_batch_parquet(writer, batch, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Skema tetap (teks + timestamp) agar semua batch dapat ditulis ke satu file
+    schema = pa.schema([
+        (col, pa.timestamp('us') if col == 'Tanggal Keluhan' else pa.string())
+        for col in batch.columns
+    ])
+    batch = batch.assign(**{
+        col: pd.to_datetime(batch[col], errors='coerce') if col == 'Tanggal Keluhan' else batch[col].astype('string')
+        for col in batch.columns
+    })
+    if writer is None:
+        writer = pq.ParquetWriter(path, schema)
+    writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+    return writer
+
+def simpan_parquet(data, file_hash):
+    path = path_parquet(file_hash)
+    tmp = f'{path}.tmp'
+    data.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    bersihkan_cache_parquet()
+
+def bersihkan_cache_parquet(batas_mb=BATAS_CACHE_PARQUET_MB):
+    # Hapus file yang paling lama tidak dipakai sampai total ukuran di bawah batas
+    files = [os.path.join(CACHE_DIR, f) for f in os.listdir(CACHE_DIR) if f.endswith('.parquet')]
+    files.sort(key=os.path.getmtime)
+    total = sum(os.path.getsize(f) for f in files)
+    while files and total > batas_mb * 1024 * 1024:
+        path = files.pop(0)
+        total -= os.path.getsize(path)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def baca_parquet(file_hash, columns=None):
+    path = path_parquet(file_hash)
+    # mtime diperbarui agar file yang sering dipakai tidak tereviksi
+    os.utime(path)
+    data = pd.read_parquet(path, columns=columns, memory_map=True)
+    return siapkan_tipe(data)
+
+def cube_dari_parquet(file_hash, streaming=False, ukuran_batch=UKURAN_BATCH_STREAMING, backend=None, normalisasi=True):
+    import pyarrow.parquet as pq
+    from auto_rkm.backend import CUBE_PARQUET_BACKEND, pilih_backend, samakan_tipe
+
+    # polars/duckdb membaca Parquet langsung tanpa memuat seluruh data ke pandas
+    metadata = pq.read_metadata(path_parquet(file_hash))
+    backend = pilih_backend(metadata.num_rows, backend)
+    if backend != 'pandas':
+        os.utime(path_parquet(file_hash))
+        dims = [col for col in CUBE_DIMS if col in metadata.schema.names]
+        cube = CUBE_PARQUET_BACKEND[backend](path_parquet(file_hash), dims)
+        return padatkan_cube(samakan_tipe(cube), normalisasi)
+
+    if not streaming:
+        return buat_cube(baca_parquet(file_hash), normalisasi=normalisasi)
+
+    os.utime(path_parquet(file_hash))
+    gabungan = GabunganCube()
+    for batch in pq.ParquetFile(path_parquet(file_hash), memory_map=True).iter_batches(ukuran_batch):
+        gabungan.tambah(buat_cube(batch.to_pandas(), normalisasi=False))
+    return gabungan.hasil(normalisasi)
+
+def hash_isi(isi_file):
+    return hashlib.sha256(isi_file).hexdigest()
+
+def muat_cube(isi_file, file_hash=None, normalisasi=True):
+    # Satu file upload -> cube; memakai cache Parquet bila file pernah diproses.
+    # normalisasi=False bila cube masih akan digabung dengan file lain.
+    file_hash = file_hash or hash_isi(isi_file)
+    streaming = len(isi_file) > BATAS_STREAMING_MB * 1024 * 1024
+    simpan_cache = parquet_tersedia()
+    if simpan_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+
+    if ada_cache_parquet(file_hash):
+        return cube_dari_parquet(file_hash, streaming, normalisasi=normalisasi)
+
+    if streaming:
+        cube = baca_excel_streaming(
+            BytesIO(isi_file),
+            path_parquet=path_parquet(file_hash) if simpan_cache else None,
+            normalisasi=normalisasi
+        )
+        if simpan_cache:
+            bersihkan_cache_parquet()
+        return cube
+
+    data = baca_excel(BytesIO(isi_file))
+    if simpan_cache:
+        simpan_parquet(data, file_hash)
+    return buat_cube(data, normalisasi=normalisasi)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+# Generator data ekspor keluhan sintetis untuk benchmark; distribusi Instansi,
+# Topik dan lokasi dibuat timpang (Zipf) seperti data asli
+
+STATUS = {'Selesai': 0.85, 'Proses': 0.10, 'Ditolak': 0.05}
+KATEGORI = {'Keluhan': 0.6, 'Permohonan Informasi': 0.3, 'Aspirasi': 0.1}
+CHANNEL = {'WhatsApp': 0.4, 'Website': 0.2, 'Instagram': 0.15, 'Telepon': 0.1, 'Email': 0.1, 'Datang Langsung': 0.05}
+JENIS_INSTANSI = ['Dinas', 'Dinas', 'Badan', 'Kecamatan', 'RSUD']
+
+def pilih_zipf(rng, n, ukuran, a=1.1):
+    bobot = 1 / np.arange(1, n + 1) ** a
+    return rng.choice(n, size=ukuran, p=bobot / bobot.sum())
+
+def pilih_bobot(rng, bobot, ukuran):
+    nilai = np.array(list(bobot), dtype=object)
+    p = np.array(list(bobot.values()))
+    return nilai[rng.choice(len(nilai), size=ukuran, p=p / p.sum())]
+
+def buat_data_sintetis(
+    n_baris=10_000,
+    n_instansi=100,
+    n_topik=300,
+    n_kecamatan=10,
+    n_kelurahan=100,
+    rentang_hari=365,
+    mulai='2024-01-01',
+    seed=0,
+):
+    rng = np.random.default_rng(seed)
+
+    instansi = np.array(
+        [f'{JENIS_INSTANSI[i % len(JENIS_INSTANSI)]} {i + 1:04d}' for i in range(n_instansi)], dtype=object
+    )
+    topik = np.array([f'Topik {i + 1:05d}' for i in range(n_topik)], dtype=object)
+    kecamatan = np.array([f'Kecamatan {i + 1:03d}' for i in range(n_kecamatan)], dtype=object)
+    kelurahan = np.array([f'Kelurahan {i + 1:04d}' for i in range(n_kelurahan)], dtype=object)
+
+    # Setiap kelurahan berada di satu kecamatan
+    idx_kelurahan = pilih_zipf(rng, n_kelurahan, n_baris, a=0.8)
+    detik = rng.integers(0, rentang_hari * 24 * 3600, size=n_baris)
+
+    return pd.DataFrame({
+        'No Tiket': np.char.add('RKM-', np.arange(1, n_baris + 1).astype(str)).astype(object),
+        'Tanggal Keluhan': pd.Timestamp(mulai) + pd.to_timedelta(detik, unit='s'),
+        'Instansi': instansi[pilih_zipf(rng, n_instansi, n_baris)],
+        'Topik': topik[pilih_zipf(rng, n_topik, n_baris)],
+        'Kategori': pilih_bobot(rng, KATEGORI, n_baris),
+        'Channel': pilih_bobot(rng, CHANNEL, n_baris),
+        'Status': pilih_bobot(rng, STATUS, n_baris),
+        'Kecamatan': kecamatan[idx_kelurahan % n_kecamatan],
+        'Kelurahan': kelurahan[idx_kelurahan],
+        'Isi Keluhan': np.array(
+            [f'Isi laporan masyarakat contoh nomor {i}' for i in range(50)], dtype=object
+        )[rng.integers(0, 50, size=n_baris)],
+    })
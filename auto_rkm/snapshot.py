@@ -0,0 +1,111 @@
+import json
+import zipfile
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+
+from auto_rkm.agregasi import rekap_cube
+from auto_rkm.cache import perkiraan_ukuran
+from auto_rkm.indeks import KOLOM_INDEKS, TABEL_INDEKS, IndeksTopik
+from auto_rkm.pembacaan import parquet_tersedia
+from auto_rkm.tabel import TabelGrafik, tabel_grafik
+
+FORMAT_SNAPSHOT = 'auto-rkm-snapshot'
+VERSI_SNAPSHOT = 1
+# Ekstensi file snapshot (arsip zip berisi manifest.json dan tabel Parquet)
+EKSTENSI_SNAPSHOT = 'rkm'
+MIME_SNAPSHOT = 'application/zip'
+
+class Snapshot:
+    # Laporan RKM siap tampil: rekap, tabel channel, tabel setiap grafik (tren
+    # disimpan harian) dan indeks drill-down OPD. Snapshot hanya berisi hasil
+    # agregasi sehingga kecil dan dapat dibuka kembali tanpa file Excel asli
+    # maupun perhitungan ulang.
+
+    def __init__(self, rkm, kategori, grafik, indeks, meta=None):
+        self.rkm = rkm
+        self.kategori = kategori
+        self.grafik = grafik
+        self.indeks = indeks
+        self.meta = meta or {}
+
+    @classmethod
+    def dari_cube(cls, cube, rkm=None, kategori=None, indeks=None, label=None):
+        # Hasil yang sudah dihitung (misalnya dari cache dashboard) dapat diberikan langsung
+        if rkm is None or kategori is None:
+            rkm, kategori = rekap_cube(cube)
+        if indeks is None:
+            # File yang hanya berisi kolom wajib tetap dapat disimpan dengan indeks kosong
+            indeks = IndeksTopik.dari_cube(cube) if KOLOM_INDEKS.issubset(cube.columns) else IndeksTopik.kosong()
+        meta = {
+            'label': label,
+            'dibuat': datetime.now().isoformat(timespec='seconds'),
+            'jumlah_baris': int(cube['Jumlah'].sum()),
+        }
+        if 'Tanggal Keluhan' in cube.columns and cube['Tanggal Keluhan'].notna().any():
+            meta['tanggal_awal'] = cube['Tanggal Keluhan'].min().date().isoformat()
+            meta['tanggal_akhir'] = cube['Tanggal Keluhan'].max().date().isoformat()
+        return cls(rkm, kategori, TabelGrafik(tabel=tabel_grafik(cube)), indeks, meta)
+
+    def tabel(self):
+        return {
+            'Hasil RKM': self.rkm,
+            'Kategori Keluhan': self.kategori,
+            **self.grafik.semua(),
+            **self.indeks.ke_tabel(),
+        }
+
+    def ke_bytes(self):
+        if not parquet_tersedia():
+            raise ValueError("Snapshot membutuhkan paket pyarrow.")
+
+        tabel = self.tabel()
+        manifest = {
+            'format': FORMAT_SNAPSHOT,
+            'versi': VERSI_SNAPSHOT,
+            'meta': self.meta,
+            'tabel': {nama: f'tabel-{i}.parquet' for i, nama in enumerate(tabel)},
+        }
+        output = BytesIO()
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as arsip:
+            arsip.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=1))
+            for nama, df in tabel.items():
+                buffer = BytesIO()
+                df.to_parquet(buffer, index=False)
+                arsip.writestr(manifest['tabel'][nama], buffer.getvalue(), zipfile.ZIP_STORED)
+        return output.getvalue()
+
+    @classmethod
+    def dari_bytes(cls, isi_file):
+        if not parquet_tersedia():
+            raise ValueError("Snapshot membutuhkan paket pyarrow.")
+        try:
+            with zipfile.ZipFile(BytesIO(isi_file)) as arsip:
+                manifest = json.loads(arsip.read('manifest.json'))
+                if manifest.get('format') != FORMAT_SNAPSHOT:
+                    raise ValueError("File bukan snapshot AUTO-RKM yang valid.")
+                if manifest.get('versi', 0) > VERSI_SNAPSHOT:
+                    raise ValueError("Snapshot dibuat oleh versi AUTO-RKM yang lebih baru.")
+                tabel = {
+                    nama: pd.read_parquet(BytesIO(arsip.read(file))) for nama, file in manifest['tabel'].items()
+                }
+            rkm = tabel.pop('Hasil RKM')
+            kategori = tabel.pop('Kategori Keluhan')
+            indeks = IndeksTopik.dari_tabel({nama: tabel.pop(nama) for nama in TABEL_INDEKS})
+        except (zipfile.BadZipFile, KeyError, TypeError, AttributeError):
+            # Arsip rusak, manifest tidak lengkap atau tabel wajib tidak ada
+            raise ValueError("File bukan snapshot AUTO-RKM yang valid.")
+        return cls(rkm, kategori, TabelGrafik(tabel=tabel), indeks, manifest.get('meta'))
+
+    def ukuran_memori(self):
+        return sum(perkiraan_ukuran(df) for df in self.tabel().values())
+
+    def simpan(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.ke_bytes())
+
+    @classmethod
+    def muat(cls, path):
+        with open(path, 'rb') as f:
+            return cls.dari_bytes(f.read())
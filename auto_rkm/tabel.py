@@ -0,0 +1,159 @@
+import pandas as pd
+
+from auto_rkm.agregasi import count_by, flag_opd
+
+# Tabel data untuk setiap grafik dashboard, dihitung dari count cube
+
+# Granularitas grafik tren -> frekuensi periode pandas
+GRANULARITAS_TREN = {'hari': 'D', 'minggu': 'W', 'bulan': 'M'}
+# Batas titik grafik tren harian; rentang yang lebih panjang otomatis dijadikan
+# mingguan/bulanan agar spec Vega-Lite yang dikirim ke browser tetap kecil
+MAKS_TITIK_TREN = 366
+# Perkiraan jumlah hari per periode, untuk menyesuaikan jendela rata-rata bergerak
+# harian bila grafik otomatis dijadikan mingguan/bulanan
+HARI_PER_PERIODE = {'hari': 1, 'minggu': 7, 'bulan': 30}
+
+def tabel_lokasi(cube, kolom, top_n=5):
+    required_cols = {kolom, 'Status'}
+    if not required_cols.issubset(cube.columns):
+        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
+
+    return count_by(cube, kolom, {'Status': 'Selesai'}, top_n=top_n)
+
+def tabel_kategori(cube):
+    required_cols = {'Kategori', 'Status'}
+    if not required_cols.issubset(cube.columns):
+        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
+
+    df = count_by(cube, 'Kategori', {'Status': 'Selesai'})
+    df['Persentase'] = (df['Jumlah'] / df['Jumlah'].sum()) * 100
+    return label_persen(df)
+
+def label_persen(df):
+    df['PersenLabel'] = df['Persentase'].map(lambda x: f"{x:.1f}%")
+    return df
+
+def tabel_tren(cube, kategori, granularitas='hari', rata_bergerak=None, maks_titik=MAKS_TITIK_TREN):
+    required_cols = {'Tanggal Keluhan', 'Status', 'Kategori'}
+    if not required_cols.issubset(cube.columns):
+        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
+    if granularitas not in GRANULARITAS_TREN:
+        raise ValueError(f"Granularitas tren harus salah satu dari: {list(GRANULARITAS_TREN)}")
+
+    # Tanggal pada cube sudah dibulatkan per hari
+    tren = count_by(cube, 'Tanggal Keluhan', {'Status': 'Selesai', 'Kategori': kategori})
+    tren = tren.sort_values(by='Tanggal Keluhan').reset_index(drop=True)
+    return olah_tren(tren, granularitas, rata_bergerak, maks_titik)
+
+def olah_tren(tren, granularitas='hari', rata_bergerak=None, maks_titik=MAKS_TITIK_TREN):
+    # tren: jumlah harian (Tanggal Keluhan, Jumlah) urut tanggal, dari cube atau snapshot
+    if granularitas not in GRANULARITAS_TREN:
+        raise ValueError(f"Granularitas tren harus salah satu dari: {list(GRANULARITAS_TREN)}")
+    tren = tren[['Tanggal Keluhan', 'Jumlah']]
+    harian = tren.set_index('Tanggal Keluhan')['Jumlah']
+
+    # maks_titik=None mempertahankan data harian penuh (dipakai untuk ekspor)
+    if granularitas == 'hari' and maks_titik and len(harian) and (harian.index[-1] - harian.index[0]).days >= maks_titik:
+        granularitas = 'minggu' if (harian.index[-1] - harian.index[0]).days < maks_titik * 7 else 'bulan'
+        if rata_bergerak:
+            # Jendela diisi pengguna dalam hari: 28 hari menjadi 4 minggu, 7 hari
+            # menjadi 1 minggu (tanpa garis rata-rata karena satu titik sudah 7 hari)
+            rata_bergerak = max(1, round(rata_bergerak / HARI_PER_PERIODE[granularitas]))
+
+    if granularitas != 'hari' and len(harian):
+        # Dijumlahkan per periode dan diberi label tanggal awal periode
+        periode = harian.index.to_period(GRANULARITAS_TREN[granularitas])
+        tren = harian.groupby(periode).sum()
+        tren = tren.reindex(pd.period_range(tren.index.min(), tren.index.max()), fill_value=0)
+        tren.index = tren.index.start_time
+        tren = tren.rename_axis('Tanggal Keluhan').reset_index()
+
+    if rata_bergerak and rata_bergerak > 1 and len(tren):
+        # Rata-rata dihitung pada deret periode lengkap (periode kosong = 0)
+        seri = tren.set_index('Tanggal Keluhan')['Jumlah']
+        if granularitas == 'hari':
+            seri = seri.asfreq('D', fill_value=0)
+        rata = seri.rolling(rata_bergerak, min_periods=1).mean()
+        tren['Rata-rata'] = rata.reindex(tren['Tanggal Keluhan']).to_numpy()
+
+    tren.attrs['granularitas'] = granularitas
+    tren.attrs['rata_bergerak'] = rata_bergerak or 0
+    return tren
+
+# Nama tabel tren harian pada tabel_grafik (dan snapshot) per kategori
+NAMA_TABEL_TREN = {'Keluhan': 'Tren Keluhan', 'Permohonan Informasi': 'Tren Permohonan Info'}
+
+def filter_opd(kategori):
+    return {'Status': 'Selesai', 'Kategori': kategori, 'Instansi': flag_opd}
+
+def tabel_top_opd(cube, kategori, top_n=5):
+    required_cols = {'Kategori', 'Status', 'Instansi'}
+    if not required_cols.issubset(cube.columns):
+        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
+
+    return count_by(cube, 'Instansi', filter_opd(kategori), top_n=top_n)
+
+def tabel_topik_opd(cube, kategori, instansi):
+    required_cols = {'Kategori', 'Status', 'Instansi', 'Topik'}
+    if not required_cols.issubset(cube.columns):
+        raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
+
+    return count_by(cube, 'Topik', {**filter_opd(kategori), 'Instansi': instansi})
+
+def tabel_grafik(cube):
+    # Semua tabel grafik untuk ekspor; grafik yang kolomnya tidak ada dilewati
+    pembuat = {
+        'Kecamatan Teratas': lambda: tabel_lokasi(cube, 'Kecamatan'),
+        'Kelurahan Teratas': lambda: tabel_lokasi(cube, 'Kelurahan'),
+        'Persentase Kategori': lambda: tabel_kategori(cube)[['Kategori', 'Jumlah', 'Persentase']],
+        **{
+            nama: lambda kategori=kategori: tabel_tren(cube, kategori, maks_titik=None)
+            for kategori, nama in NAMA_TABEL_TREN.items()
+        },
+        'OPD Keluhan': lambda: tabel_top_opd(cube, 'Keluhan'),
+        'OPD Permohonan Info': lambda: tabel_top_opd(cube, 'Permohonan Informasi'),
+    }
+    tabel = {}
+    for nama, buat in pembuat.items():
+        try:
+            tabel[nama] = buat()
+        except ValueError:
+            continue
+    return tabel
+
+class TabelGrafik:
+    # Sumber tabel grafik dashboard: dihitung dari cube, atau dibaca dari tabel
+    # tersimpan (snapshot) tanpa cube. Tren mingguan/bulanan dan rata-rata
+    # bergerak diturunkan dari tabel tren harian.
+
+    def __init__(self, cube=None, tabel=None):
+        self.cube = cube
+        self.tabel = tabel or {}
+
+    @classmethod
+    def dari_cube(cls, cube):
+        return cls(cube=cube)
+
+    def tersimpan(self, nama, required_cols):
+        if nama not in self.tabel:
+            raise ValueError(f"Tidak Dapat Melakukan Visualisasi Karena Tidak Terdapat Kolom: {required_cols}")
+        return self.tabel[nama]
+
+    def lokasi(self, kolom):
+        if self.cube is not None:
+            return tabel_lokasi(self.cube, kolom)
+        return self.tersimpan(f'{kolom} Teratas', {kolom, 'Status'})
+
+    def kategori(self):
+        if self.cube is not None:
+            return tabel_kategori(self.cube)
+        return label_persen(self.tersimpan('Persentase Kategori', {'Kategori', 'Status'}).copy())
+
+    def tren(self, kategori, granularitas='hari', rata_bergerak=None, maks_titik=MAKS_TITIK_TREN):
+        if self.cube is not None:
+            return tabel_tren(self.cube, kategori, granularitas, rata_bergerak, maks_titik)
+        harian = self.tersimpan(NAMA_TABEL_TREN.get(kategori), {'Tanggal Keluhan', 'Status', 'Kategori'})
+        return olah_tren(harian, granularitas, rata_bergerak, maks_titik)
+
+    def semua(self):
+        return tabel_grafik(self.cube) if self.cube is not None else dict(self.tabel)
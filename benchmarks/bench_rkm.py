@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from auto_rkm import AUTO_RKM, IndeksTopik, baca_excel, buat_cube, rekap_cube, to_excel  # noqa: E402
+from auto_rkm.backend import backend_tersedia  # noqa: E402
+from auto_rkm.ekspor import ekspor  # noqa: E402
+from auto_rkm.pembacaan import KOLOM_DIPAKAI, siapkan_tipe  # noqa: E402
+from auto_rkm.sintetis import buat_data_sintetis  # noqa: E402
+from auto_rkm.tabel import tabel_grafik, tabel_kategori, tabel_lokasi, tabel_top_opd, tabel_tren  # noqa: E402
+
+# Batas baris sheet Excel (1.048.576 termasuk header)
+MAKS_BARIS_EXCEL = 1_048_575
+# Parameter generator data sintetis yang dicatat di setiap baris hasil; hasil
+# hanya dibandingkan dengan acuan yang dibuat dengan parameter yang sama
+PARAMETER_GENERATOR = ['instansi', 'topik', 'kecamatan', 'kelurahan', 'hari', 'seed']
+
+def ukur(fungsi, ulang):
+    durasi = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi.append(time.perf_counter() - mulai)
+    return min(durasi), statistics.median(durasi)
+
+def commit_git():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def file_contoh(data, args, folder, format):
+    # File contoh disimpan per parameter generator agar tidak dibuat ulang setiap run
+    nama = f"rkm_{len(data)}_{args.instansi}_{args.topik}_{args.kecamatan}_{args.kelurahan}_{args.hari}_{args.seed}.{format}"
+    path = os.path.join(folder, nama)
+    if not os.path.exists(path):
+        if format == 'xlsx':
+            data.to_excel(path, index=False)
+        else:
+            data.to_parquet(path, index=False)
+    return path
+
+def periksa_backend(typed, backend):
+    # Cube dan seluruh tabel turunannya harus identik dengan hasil backend pandas
+    acuan = buat_cube(typed, backend='pandas')
+    cube = buat_cube(typed, backend=backend)
+    pd.testing.assert_frame_equal(acuan, cube)
+    pd.testing.assert_frame_equal(rekap_cube(acuan)[0], rekap_cube(cube)[0])
+    for nama, tabel in tabel_grafik(acuan).items():
+        pd.testing.assert_frame_equal(tabel, tabel_grafik(cube)[nama], obj=nama)
+
+def daftar_tahap(data, args, folder):
+    tahap = {}
+    if len(data) <= min(args.maks_xlsx, MAKS_BARIS_EXCEL):
+        path_xlsx = file_contoh(data, args, folder, 'xlsx')
+        tahap['ingest_xlsx'] = lambda: baca_excel(path_xlsx)
+    path_parquet = file_contoh(data, args, folder, 'parquet')
+    tahap['ingest_parquet'] = lambda: siapkan_tipe(pd.read_parquet(path_parquet, columns=KOLOM_DIPAKAI))
+
+    typed = siapkan_tipe(data[KOLOM_DIPAKAI].copy())
+    for backend in args.backend:
+        if backend != 'pandas':
+            periksa_backend(typed, backend)
+    cube = buat_cube(typed)
+    rkm, _ = rekap_cube(cube)
+    tahap.update({
+        'AUTO_RKM': lambda: AUTO_RKM(typed),
+        'buat_cube': lambda: buat_cube(typed),
+        **{
+            f'buat_cube_{backend}': lambda backend=backend: buat_cube(typed, backend=backend)
+            for backend in args.backend
+        },
+        'rekap_cube': lambda: rekap_cube(cube),
+        'vis_kecamatan': lambda: tabel_lokasi(cube, 'Kecamatan'),
+        'vis_kelurahan': lambda: tabel_lokasi(cube, 'Kelurahan'),
+        'persen_kategori': lambda: tabel_kategori(cube),
+        'tren_keluhan': lambda: tabel_tren(cube, 'Keluhan'),
+        'tren_permohonan_info': lambda: tabel_tren(cube, 'Permohonan Informasi'),
+        'opd_vis': lambda: tabel_top_opd(cube, 'Keluhan'),
+        'opdInfo_vis': lambda: tabel_top_opd(cube, 'Permohonan Informasi'),
+        'indeks_topik': lambda: IndeksTopik.dari_cube(cube),
+        'to_excel': lambda: to_excel(rkm),
+        'ekspor_xlsx': lambda: ekspor({'Hasil RKM': rkm, **tabel_grafik(cube)}),
+    })
+    return tahap
+
+def kunci_hasil(r):
+    # Baris acuan versi lama tanpa parameter generator mendapat kunci None sehingga
+    # tidak pernah cocok dengan hasil baru
+    generator = r.get('generator')
+    return r['skala'], r['tahap'], tuple(sorted(generator.items())) if generator else None
+
+def bandingkan(hasil, path_acuan, toleransi):
+    # Membandingkan detik_min per (skala, tahap, parameter generator) dengan hasil
+    # acuan. File acuan dapat berisi beberapa run (--output menambahkan baris);
+    # baris terakhir untuk setiap kunci yang dipakai.
+    with open(path_acuan, encoding='utf-8') as f:
+        acuan = {kunci_hasil(r): r for r in map(json.loads, f)}
+
+    regresi = []
+    dilewati = []
+    commit_acuan = set()
+    for r in hasil:
+        lama = acuan.get(kunci_hasil(r))
+        if lama is None:
+            if any(kunci[:2] == (r['skala'], r['tahap']) for kunci in acuan):
+                dilewati.append(r['tahap'])
+            continue
+        commit_acuan.add(lama.get('commit'))
+        if not lama['detik_min']:
+            continue
+        rasio = r['detik_min'] / lama['detik_min']
+        tanda = 'REGRESI' if rasio > toleransi else ''
+        print(f"{r['skala']:>9} {r['tahap']:<22} {lama['detik_min']:9.4f} -> {r['detik_min']:9.4f}  x{rasio:5.2f} {tanda}")
+        if tanda:
+            regresi.append(r)
+
+    if commit_acuan:
+        print(f"Acuan dari commit {', '.join(sorted(str(c) for c in commit_acuan))}; sekarang {hasil[0]['commit']}.")
+    if len(commit_acuan) > 1:
+        print("Peringatan: acuan berasal dari lebih dari satu commit.", file=sys.stderr)
+    if dilewati:
+        generator = ', '.join(f'{nama}={nilai}' for nama, nilai in hasil[0]['generator'].items())
+        print(
+            f"Peringatan: {len(dilewati)} tahap tidak dibandingkan karena parameter generator acuannya "
+            f"berbeda atau tidak tercatat (sekarang {generator}).",
+            file=sys.stderr
+        )
+    if not commit_acuan:
+        print("Peringatan: tidak ada hasil acuan dengan skala dan parameter generator yang sama.", file=sys.stderr)
+    return regresi
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark ingestion, AUTO_RKM, agregasi grafik dan ekspor AUTO-RKM.')
+    parser.add_argument('--skala', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help='jumlah baris data sintetis')
+    parser.add_argument('--instansi', type=int, default=200)
+    parser.add_argument('--topik', type=int, default=500)
+    parser.add_argument('--kecamatan', type=int, default=20)
+    parser.add_argument('--kelurahan', type=int, default=200)
+    parser.add_argument('--hari', type=int, default=365, help='rentang tanggal keluhan dalam hari')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ulang', type=int, default=3, help='pengulangan per tahap; dicatat minimum dan median')
+    parser.add_argument('--maks-xlsx', type=int, default=200_000, help='skala terbesar yang ikut benchmark baca .xlsx')
+    parser.add_argument('--folder-data', default=os.path.join(tempfile.gettempdir(), 'auto-rkm-bench'))
+    parser.add_argument('--output', help='tambahkan hasil sebagai JSON lines ke file ini')
+    parser.add_argument('--bandingkan', help='file JSON lines hasil acuan untuk deteksi regresi')
+    parser.add_argument('--toleransi', type=float, default=1.25, help='rasio waktu maksimum terhadap acuan')
+    parser.add_argument(
+        '--backend', nargs='*', default=[], choices=backend_tersedia(),
+        help='ukur buat_cube per backend agregasi dan periksa hasilnya sama dengan pandas'
+    )
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.folder_data, exist_ok=True)
+    meta = {
+        'waktu': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_git(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'generator': {nama: getattr(args, nama) for nama in PARAMETER_GENERATOR},
+    }
+
+    hasil = []
+    for skala in args.skala:
+        data = buat_data_sintetis(
+            skala, args.instansi, args.topik, args.kecamatan, args.kelurahan, args.hari, seed=args.seed
+        )
+        for nama, fungsi in daftar_tahap(data, args, args.folder_data).items():
+            detik_min, detik_median = ukur(fungsi, args.ulang)
+            hasil.append({
+                **meta,
+                'skala': skala,
+                'tahap': nama,
+                'detik_min': round(detik_min, 5),
+                'detik_median': round(detik_median, 5),
+                'ulang': args.ulang,
+            })
+            print(f"{skala:>9} {nama:<22} min {detik_min:9.4f} s  median {detik_median:9.4f} s", flush=True)
+
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            for r in hasil:
+                f.write(json.dumps(r) + '\n')
+
+    if args.bandingkan and bandingkan(hasil, args.bandingkan, args.toleransi):
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Cache Parquet, peta normalisasi dan state kumulatif selama test ditulis ke
+# folder sementara, bukan ke ~/.cache/auto-rkm milik pengguna
+os.environ.setdefault('AUTO_RKM_CACHE_DIR', tempfile.mkdtemp(prefix='auto-rkm-test-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
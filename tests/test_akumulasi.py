@@ -0,0 +1,130 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from auto_rkm.agregasi import buat_cube, rekap_cube
+from auto_rkm.akumulasi import RekapKumulatif, baca_delta
+from auto_rkm.ekspor import to_excel
+from auto_rkm.sintetis import buat_data_sintetis
+
+pytest.importorskip('pyarrow')
+
+def data_hari(tiket, status):
+    return pd.DataFrame({
+        'No Tiket': tiket,
+        'Instansi': ['Dinas PU'] * len(tiket),
+        'Topik': ['Jalan Rusak'] * len(tiket),
+        'Channel': ['WhatsApp'] * len(tiket),
+        'Status': status,
+    })
+
+def test_tiket_yang_berubah_status_menggantikan_hitungan_lama(tmp_path):
+    state = RekapKumulatif(str(tmp_path))
+    assert state.tambah(data_hari(['T1', 'T2'], ['Proses', 'Selesai'])) == 2
+    state.simpan()
+
+    state = RekapKumulatif.muat(str(tmp_path))
+    hari_2 = data_hari(['T1', 'T2'], ['Selesai', 'Selesai'])
+    # Hanya T1 yang berubah; T2 sama persis dan dilewati
+    assert state.tambah(hari_2) == 1
+    state.simpan()
+
+    rkm, _ = rekap_cube(RekapKumulatif.muat(str(tmp_path)).cube)
+    segar, _ = rekap_cube(buat_cube(hari_2))
+    assert rkm['Jumlah'].tolist() == segar['Jumlah'].tolist() == [2]
+    # Tidak ada sisa kombinasi Proses di cube
+    assert set(RekapKumulatif.muat(str(tmp_path)).cube['Status']) == {'Selesai'}
+
+def test_upload_ulang_tidak_terhitung_dua_kali(tmp_path):
+    data = buat_data_sintetis(n_baris=2_000, seed=7)
+    state = RekapKumulatif(str(tmp_path))
+    assert state.tambah(data) == 2_000
+    assert state.tambah(data) == 0
+    pd.testing.assert_frame_equal(rekap_cube(state.cube)[0], rekap_cube(buat_cube(data))[0])
+
+def test_cube_sama_dengan_rekap_ulang_setelah_banyak_perubahan(tmp_path):
+    data = buat_data_sintetis(n_baris=3_000, seed=8)
+    state = RekapKumulatif(str(tmp_path))
+    state.tambah(data.iloc[:2_000])
+    state.simpan()
+
+    # Ekspor berikutnya: sebagian tiket lama berubah status dan ada tiket baru
+    terbaru = data.copy()
+    terbaru.loc[terbaru.index[::3], 'Status'] = 'Selesai'
+    state = RekapKumulatif.muat(str(tmp_path))
+    state.tambah(terbaru)
+    state.simpan()
+
+    state = RekapKumulatif.muat(str(tmp_path))
+    rkm, kategori = rekap_cube(state.cube)
+    rkm_segar, kategori_segar = rekap_cube(buat_cube(terbaru))
+    pd.testing.assert_frame_equal(
+        rkm.drop(columns='Topik').sort_values('Instansi').reset_index(drop=True),
+        rkm_segar.drop(columns='Topik').sort_values('Instansi').reset_index(drop=True),
+    )
+    assert state.cube['Jumlah'].sum() == len(terbaru)
+    assert state.jumlah_baris == len(terbaru)
+
+def urut_cube(cube):
+    cube = cube.astype({col: object for col in cube.columns if col not in ('Jumlah', 'Tanggal Keluhan')})
+    cube = cube.assign(Jumlah=cube['Jumlah'].astype('int64'), **{'Tanggal Keluhan': cube['Tanggal Keluhan'].astype('datetime64[ns]')})
+    return cube.sort_values(list(cube.columns)).reset_index(drop=True)
+
+def test_kolom_berbeda_antar_upload_dan_muat_ulang(tmp_path):
+    data = buat_data_sintetis(n_baris=3_000, seed=11)
+    state = RekapKumulatif(str(tmp_path))
+    # Upload pertama tanpa Kecamatan dan tanggal, lalu disimpan dan dimuat ulang
+    state.tambah(data.iloc[:1_500].drop(columns=['Kecamatan', 'Tanggal Keluhan']))
+    state.simpan()
+
+    state = RekapKumulatif.muat(str(tmp_path))
+    terbaru = data.iloc[1_000:].copy()
+    terbaru.loc[terbaru.index[::4], 'Status'] = 'Selesai'
+    assert state.tambah(terbaru) > 0
+    # Upload ketiga tanpa Kelurahan: isinya berbeda sehingga menggantikan versi sebelumnya
+    ketiga = data.iloc[2_500:].drop(columns='Kelurahan')
+    assert state.tambah(ketiga) == len(ketiga)
+
+    akhir = pd.concat([
+        data.iloc[:1_000].drop(columns=['Kecamatan', 'Tanggal Keluhan']),
+        terbaru.iloc[:1_500],
+        ketiga,
+    ], ignore_index=True)
+    akhir = akhir[data.columns]
+    pd.testing.assert_frame_equal(urut_cube(state.cube), urut_cube(buat_cube(akhir)))
+    assert state.jumlah_baris == len(data)
+    assert state.riwayat['kunci'].is_monotonic_increasing
+
+def test_penulis_bersamaan_tidak_kehilangan_update(tmp_path):
+    folder = str(tmp_path)
+    data = buat_data_sintetis(n_baris=4_000, seed=9)
+    bagian = [data.iloc[i:i + 1_000] for i in range(0, len(data), 1_000)]
+    mulai = threading.Barrier(len(bagian))
+
+    def tulis(potongan):
+        mulai.wait()
+        with RekapKumulatif.dibuka(folder) as state:
+            state.tambah(potongan)
+            state.simpan()
+
+    threads = [threading.Thread(target=tulis, args=(potongan,)) for potongan in bagian]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    state = RekapKumulatif.muat(folder)
+    assert state.jumlah_baris == 4_000
+    assert state.cube['Jumlah'].sum() == 4_000
+    # Hanya file milik state terakhir yang tersisa
+    dipakai = set(state.file_riwayat) | {state.file_cube}
+    assert {nama for nama in os.listdir(folder) if nama.startswith(('cube-', 'riwayat-'))} == dipakai
+
+def test_baca_delta_tanpa_kolom_id_membaca_semua_kolom():
+    data = buat_data_sintetis(n_baris=200, seed=10).drop(columns='No Tiket')
+    hasil = baca_delta(to_excel(data))
+    assert 'Isi Keluhan' in hasil.columns
+    hasil = baca_delta(to_excel(buat_data_sintetis(n_baris=200, seed=10)))
+    assert 'No Tiket' in hasil.columns and 'Isi Keluhan' not in hasil.columns
@@ -0,0 +1,62 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from auto_rkm.agregasi import buat_cube, rekap_cube
+from auto_rkm.pembacaan import KOLOM_DIPAKAI, cube_dari_parquet, hash_isi, simpan_parquet, siapkan_tipe
+from auto_rkm.sintetis import buat_data_sintetis
+from auto_rkm.tabel import tabel_grafik
+
+pytest.importorskip('pyarrow')
+
+def backend_opsional(nama):
+    # Test backend dilewati bila paketnya tidak terpasang
+    return pytest.param(nama, marks=pytest.mark.skipif(
+        importlib.util.find_spec(nama) is None, reason=f'{nama} tidak terpasang'
+    ))
+
+BACKEND = [backend_opsional('polars'), backend_opsional('duckdb')]
+
+@pytest.fixture(scope='module')
+def data():
+    data = buat_data_sintetis(n_baris=10_000, rentang_hari=60, seed=12)[KOLOM_DIPAKAI].copy()
+    # Sel kosong di dimensi teks dan tanggal ikut diuji
+    rng = np.random.default_rng(12)
+    for col in ['Kecamatan', 'Topik', 'Tanggal Keluhan']:
+        data.loc[rng.random(len(data)) < 0.02, col] = None
+    return data
+
+def periksa_sama(acuan, cube):
+    pd.testing.assert_frame_equal(acuan, cube)
+    pd.testing.assert_frame_equal(rekap_cube(acuan)[0], rekap_cube(cube)[0])
+    pd.testing.assert_frame_equal(rekap_cube(acuan)[1], rekap_cube(cube)[1])
+    tabel_acuan, tabel = tabel_grafik(acuan), tabel_grafik(cube)
+    assert list(tabel) == list(tabel_acuan)
+    for nama in tabel_acuan:
+        pd.testing.assert_frame_equal(tabel_acuan[nama], tabel[nama], obj=nama)
+
+@pytest.mark.parametrize('backend', BACKEND)
+def test_cube_memori_sama_dengan_pandas(data, backend):
+    typed = siapkan_tipe(data.copy())
+    periksa_sama(buat_cube(typed, backend='pandas'), buat_cube(typed, backend=backend))
+
+@pytest.mark.parametrize('backend', BACKEND)
+def test_cube_parquet_sama_dengan_pandas(data, backend):
+    file_hash = hash_isi(b'test-backend-parquet')
+    simpan_parquet(siapkan_tipe(data.copy()), file_hash)
+    periksa_sama(
+        cube_dari_parquet(file_hash, backend='pandas'),
+        cube_dari_parquet(file_hash, backend=backend),
+    )
+
+@pytest.mark.parametrize('backend', BACKEND)
+def test_cube_parquet_streaming_sama(data, backend):
+    # Jalur streaming pandas (per batch Parquet) juga harus sama dengan backend
+    file_hash = hash_isi(b'test-backend-streaming')
+    simpan_parquet(siapkan_tipe(data.copy()), file_hash)
+    periksa_sama(
+        cube_dari_parquet(file_hash, streaming=True, ukuran_batch=3_000, backend='pandas'),
+        cube_dari_parquet(file_hash, backend=backend),
+    )
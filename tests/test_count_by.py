@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from auto_rkm.agregasi import buat_cube, count_by
+from auto_rkm.sintetis import buat_data_sintetis
+from auto_rkm.tabel import tabel_lokasi, tabel_tren
+
+@pytest.fixture(scope='module')
+def data():
+    return buat_data_sintetis(n_baris=20_000, rentang_hari=90, seed=3)
+
+@pytest.fixture(scope='module')
+def cube(data):
+    return buat_cube(data)
+
+def hitung_lama(data, dim):
+    # Logika lama dashboard: value_counts pada baris mentah berstatus Selesai
+    selesai = data[data['Status'] == 'Selesai']
+    return selesai[dim].value_counts()
+
+def sebagai_seri(df, dim):
+    return df.set_index(dim)['Jumlah'].astype('int64').rename_axis(None)
+
+@pytest.mark.parametrize('dim', ['Kecamatan', 'Kelurahan', 'Kategori', 'Instansi', 'Channel'])
+def test_count_by_sama_dengan_value_counts(data, cube, dim):
+    hasil = sebagai_seri(count_by(cube, dim, {'Status': 'Selesai'}), dim)
+    lama = hitung_lama(data, dim)
+    assert hasil.to_dict() == lama.to_dict()
+    # Urutan jumlah menurun sama seperti value_counts
+    assert hasil.is_monotonic_decreasing
+
+@pytest.mark.parametrize('kolom', ['Kecamatan', 'Kelurahan'])
+def test_tabel_lokasi_top_n(data, cube, kolom):
+    hasil = tabel_lokasi(cube, kolom, top_n=5)
+    lama = hitung_lama(data, kolom).head(5)
+    assert list(hasil.columns) == [kolom, 'Jumlah']
+    assert hasil['Jumlah'].tolist() == lama.tolist()
+    # Nilai yang jumlahnya sama boleh berbeda urutan, tetapi jumlah tiap nilai harus tepat
+    semua = hitung_lama(data, kolom)
+    assert all(semua[nilai] == jumlah for nilai, jumlah in zip(hasil[kolom], hasil['Jumlah']))
+
+@pytest.mark.parametrize('kategori', ['Keluhan', 'Permohonan Informasi'])
+def test_tabel_tren_filter_status_dan_kategori(data, cube, kategori):
+    hasil = tabel_tren(cube, kategori)
+    saring = data[(data['Status'] == 'Selesai') & (data['Kategori'] == kategori)]
+    lama = saring['Tanggal Keluhan'].dt.normalize().value_counts().sort_index()
+
+    assert hasil['Tanggal Keluhan'].is_monotonic_increasing
+    pd.testing.assert_series_equal(
+        sebagai_seri(hasil, 'Tanggal Keluhan'), lama, check_names=False, check_freq=False
+    )
+
+def test_tabel_tren_mengabaikan_status_lain():
+    data = pd.DataFrame({
+        'Tanggal Keluhan': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-02']),
+        'Status': ['Selesai', 'Proses', 'Selesai', 'Selesai'],
+        'Kategori': ['Keluhan', 'Keluhan', 'Keluhan', 'Permohonan Informasi'],
+    })
+    hasil = tabel_tren(buat_cube(data), 'Keluhan')
+    # Baris Proses dan baris kategori lain tidak ikut dihitung
+    assert hasil['Jumlah'].tolist() == [1, 1]
+
+def test_rata_bergerak_harian_disesuaikan_saat_diturunkan():
+    tanggal = pd.date_range('2022-01-01', '2023-12-31', freq='D')
+    data = pd.DataFrame({
+        'Tanggal Keluhan': tanggal,
+        'Status': 'Selesai',
+        'Kategori': 'Keluhan',
+    })
+    # Dua tahun harian -> mingguan; 28 hari menjadi 4 minggu
+    hasil = tabel_tren(buat_cube(data), 'Keluhan', rata_bergerak=28)
+    assert hasil.attrs['granularitas'] == 'minggu'
+    assert hasil.attrs['rata_bergerak'] == 4
+    assert hasil['Rata-rata'].iloc[10] == hasil['Jumlah'].iloc[7:11].mean()
+    # 7 hari sama dengan satu titik mingguan: tanpa garis rata-rata
+    hasil = tabel_tren(buat_cube(data), 'Keluhan', rata_bergerak=7)
+    assert hasil.attrs['rata_bergerak'] == 1
+    assert 'Rata-rata' not in hasil.columns
@@ -0,0 +1,32 @@
+from io import BytesIO
+
+import pandas as pd
+
+from auto_rkm.agregasi import GabunganCube, buat_cube, gabung_cube
+from auto_rkm.ekspor import to_excel
+from auto_rkm.pembacaan import baca_excel, baca_excel_streaming
+from auto_rkm.sintetis import buat_data_sintetis
+
+def test_gabungan_bertingkat_sama_dengan_gabung_berurutan():
+    data = buat_data_sintetis(n_baris=30_000, seed=5)
+    batches = [buat_cube(data.iloc[i:i + 2_000].reset_index(drop=True)) for i in range(0, len(data), 2_000)]
+
+    berurutan = None
+    gabungan = GabunganCube()
+    for cube in batches:
+        berurutan = gabung_cube([berurutan, cube])
+        gabungan.tambah(cube)
+
+    # Isi dan urutan kemunculan pertama sama persis
+    pd.testing.assert_frame_equal(gabungan.hasil(), berurutan)
+    # 15 batch = 1111 biner: paling banyak satu cube per tingkat yang tersisa
+    assert [tingkat for tingkat, _ in gabungan.tumpukan] == [3, 2, 1, 0]
+
+def test_gabungan_kosong():
+    assert GabunganCube().hasil() is None
+
+def test_streaming_sama_dengan_baca_penuh():
+    isi = to_excel(buat_data_sintetis(n_baris=3_000, seed=6))
+    streaming = baca_excel_streaming(BytesIO(isi), ukuran_batch=250)
+    penuh = buat_cube(baca_excel(BytesIO(isi)))
+    pd.testing.assert_frame_equal(streaming, penuh)
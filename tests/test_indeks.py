@@ -0,0 +1,41 @@
+import pandas as pd
+
+from auto_rkm.agregasi import buat_cube
+from auto_rkm.indeks import IndeksFilter, IndeksTopik
+from auto_rkm.sintetis import buat_data_sintetis
+from auto_rkm.tabel import tabel_top_opd
+
+def test_saring_sama_dengan_filter_pandas():
+    cube = buat_cube(buat_data_sintetis(n_baris=5_000, rentang_hari=90, seed=13))
+    indeks = IndeksFilter.dari_cube(cube)
+    awal, akhir = pd.Timestamp('2024-02-01'), pd.Timestamp('2024-02-15')
+    nilai = {'Kategori': ('Keluhan',), 'Channel': ('WhatsApp', 'Email')}
+
+    hasil = indeks.saring(cube, (awal.date(), akhir.date()), nilai)
+    harapan = cube[
+        cube['Tanggal Keluhan'].between(awal, akhir)
+        & cube['Kategori'].isin(nilai['Kategori'])
+        & cube['Channel'].isin(nilai['Channel'])
+    ].reset_index(drop=True)
+    pd.testing.assert_frame_equal(hasil, harapan)
+    # Tanpa filter cube dikembalikan apa adanya
+    assert indeks.saring(cube) is cube
+
+def test_indeks_tidak_menahan_cube():
+    # Indeks disimpan di cache bersama; ukuran_memori hanya menghitung array
+    # indeks, jadi cube tidak boleh ikut tertahan olehnya
+    cube = buat_cube(buat_data_sintetis(n_baris=1_000, seed=14))
+    indeks = IndeksFilter.dari_cube(cube)
+    assert not any(isinstance(nilai, pd.DataFrame) for nilai in vars(indeks).values())
+
+def test_top_opd_indeks_sama_dengan_tabel_ekspor():
+    # Data kecil dengan banyak jumlah yang sama: urutan OPD yang seri harus sama
+    for seed in range(20):
+        cube = buat_cube(buat_data_sintetis(n_baris=300, seed=seed))
+        indeks = IndeksTopik.dari_cube(cube)
+        for kategori in ('Keluhan', 'Permohonan Informasi'):
+            pd.testing.assert_frame_equal(
+                indeks.daftar_instansi(kategori, top_n=5).astype({'Instansi': object}),
+                tabel_top_opd(cube, kategori).astype({'Instansi': object}),
+                check_dtype=False,
+            )
@@ -0,0 +1,66 @@
+import os
+from io import BytesIO
+
+import pandas as pd
+
+from auto_rkm.agregasi import AUTO_RKM, rekap_cube
+from auto_rkm.batch import proses_banyak_file
+from auto_rkm.ekspor import to_excel
+from auto_rkm.normalisasi import PetaNormalisasi, bersihkan_teks, cache_teks, normalisasi_kolom
+from auto_rkm.pembacaan import CACHE_DIR, baca_excel_streaming
+
+def data_rkm(instansi, topik):
+    return pd.DataFrame({
+        'Instansi': instansi,
+        'Topik': topik,
+        'Channel': ['WhatsApp'] * len(instansi),
+        'Status': ['Selesai'] * len(instansi),
+    })
+
+def test_varian_digabung_ke_bentuk_terbanyak():
+    rkm, _ = AUTO_RKM(data_rkm(
+        ['Dinas PU', 'DINAS PU', ' Dinas  PU ', 'Dinas PU'],
+        ['Jalan Rusak', 'jalan rusak', 'Jalan Rusak', 'Jalan Rusak'],
+    ))
+    assert rkm['Instansi'].tolist() == ['Dinas PU']
+    assert rkm['Jumlah'].tolist() == [4]
+    assert rkm['Topik'].tolist() == ['Jalan Rusak']
+
+def test_data_bersih_tidak_terpengaruh_upload_sebelumnya():
+    AUTO_RKM(data_rkm(['DINAS PU'], ['jalan rusak']))
+    rkm, _ = AUTO_RKM(data_rkm(['Dinas PU', 'Dinas PU'], ['Jalan Rusak', 'Jalan Rusak']))
+    assert rkm['Instansi'].tolist() == ['Dinas PU']
+    assert rkm['Topik'].tolist() == ['Jalan Rusak']
+
+def test_auto_rkm_tidak_menulis_peta_ke_disk():
+    AUTO_RKM(data_rkm(['DINAS PU', 'Dinas PU'], ['a', 'A']))
+    assert not os.path.exists(os.path.join(CACHE_DIR, 'normalisasi.json'))
+
+def test_peta_lintas_run_bila_diaktifkan(tmp_path):
+    path = str(tmp_path / 'peta.json')
+    pertama = pd.Series(['DINAS PU', 'DINAS PU', 'Dinas PU'], dtype='category')
+    assert normalisasi_kolom(pertama, 'Instansi', peta=PetaNormalisasi(path)).unique().tolist() == ['DINAS PU']
+
+    # Peta dibaca ulang dari file: bentuk yang sudah dipilih tetap dipakai
+    kedua = pd.Series(['Dinas PU', 'Dinas PU'], dtype='category')
+    assert normalisasi_kolom(kedua, 'Instansi', peta=PetaNormalisasi(path)).unique().tolist() == ['DINAS PU']
+
+def test_bentuk_baku_dari_seluruh_batch_dan_file():
+    # Mayoritas per bagian berbeda dengan mayoritas seluruh data: 3x 'Dinas A',
+    # lalu 6x 'DINAS A'. Batch/file pertama sendiri akan memilih 'Dinas A'.
+    data = data_rkm(['Dinas A'] * 3 + ['DINAS A'] * 6, ['Jalan Rusak'] * 9)
+    assert AUTO_RKM(data)[0]['Instansi'].tolist() == ['DINAS A']
+
+    streaming = baca_excel_streaming(BytesIO(to_excel(data)), ukuran_batch=5)
+    assert rekap_cube(streaming)[0]['Instansi'].tolist() == ['DINAS A']
+
+    banyak_file = proses_banyak_file([to_excel(data.iloc[:4]), to_excel(data.iloc[4:])], max_workers=1)
+    assert rekap_cube(banyak_file)[0]['Instansi'].tolist() == ['DINAS A']
+
+def test_teks_yang_sudah_dibersihkan_diambil_dari_cache():
+    bersihkan_teks(['  Jalan   Berlubang '])
+    assert cache_teks.isi['  Jalan   Berlubang '] == ('Jalan Berlubang', 'jalan berlubang')
+    bersih, kunci, teks = bersihkan_teks(['  Jalan   Berlubang ', None, 'BANJIR'])
+    assert bersih.tolist()[::2] == ['Jalan Berlubang', 'BANJIR']
+    assert kunci.tolist()[::2] == ['jalan berlubang', 'banjir']
+    assert teks.tolist() == [True, False, True]
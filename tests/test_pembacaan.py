@@ -0,0 +1,39 @@
+from io import BytesIO
+
+import pytest
+
+from auto_rkm import pembacaan
+from auto_rkm.ekspor import to_excel
+from auto_rkm.pembacaan import muat_cube, path_parquet, periksa_header
+from auto_rkm.sintetis import buat_data_sintetis
+
+pytest.importorskip('pyarrow')
+
+@pytest.fixture
+def isi_alias():
+    # Ekspor dengan nama kolom tanggal yang belum dikenal
+    data = buat_data_sintetis(n_baris=500, seed=15).rename(columns={'Tanggal Keluhan': 'Tanggal Lapor'})
+    return to_excel(data)
+
+def test_alias_baru_tidak_memakai_cache_lama(isi_alias, monkeypatch):
+    file_hash = pembacaan.hash_isi(isi_alias)
+    tanpa_alias = muat_cube(isi_alias, file_hash)
+    assert 'Tanggal Keluhan' not in tanpa_alias.columns
+    path_lama = path_parquet(file_hash)
+
+    monkeypatch.setattr(pembacaan, 'ALIAS_KOLOM', {**pembacaan.ALIAS_KOLOM, 'Tanggal Lapor': 'Tanggal Keluhan'})
+    assert path_parquet(file_hash) != path_lama
+    dengan_alias = muat_cube(isi_alias, file_hash)
+    assert 'Tanggal Keluhan' in dengan_alias.columns
+    assert dengan_alias['Jumlah'].sum() == tanpa_alias['Jumlah'].sum() == 500
+
+def test_header_tanpa_kolom_wajib_ditolak():
+    data = buat_data_sintetis(n_baris=10, seed=16).drop(columns='Status')
+    with pytest.raises(ValueError, match='Status'):
+        periksa_header(BytesIO(to_excel(data)))
+
+def test_file_rekap_saja_tetap_dapat_dibaca():
+    # Hanya kolom wajib: kolom grafik yang tidak ada bukan error
+    data = buat_data_sintetis(n_baris=10, seed=17)[['Instansi', 'Topik', 'Channel', 'Status']]
+    pemetaan = periksa_header(BytesIO(to_excel(data)))
+    assert set(pemetaan.values()) == {'Instansi', 'Topik', 'Channel', 'Status'}
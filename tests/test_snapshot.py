@@ -0,0 +1,51 @@
+import io
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+from auto_rkm.agregasi import buat_cube, rekap_cube
+from auto_rkm.sintetis import buat_data_sintetis
+from auto_rkm.snapshot import Snapshot
+
+pytest.importorskip('pyarrow')
+
+def test_snapshot_dibuka_kembali_sama():
+    cube = buat_cube(buat_data_sintetis(n_baris=3_000, seed=18))
+    asli = Snapshot.dari_cube(cube)
+    muat = Snapshot.dari_bytes(asli.ke_bytes())
+    pd.testing.assert_frame_equal(muat.rkm, asli.rkm, check_dtype=False)
+    pd.testing.assert_frame_equal(muat.kategori, asli.kategori, check_dtype=False)
+    for nama, tabel in asli.grafik.semua().items():
+        pd.testing.assert_frame_equal(muat.grafik.tabel[nama], tabel, check_dtype=False, obj=nama)
+    pd.testing.assert_frame_equal(
+        muat.indeks.daftar_instansi('Keluhan'), asli.indeks.daftar_instansi('Keluhan'), check_dtype=False
+    )
+
+def test_snapshot_file_rekap_saja():
+    # Tanpa Kategori: indeks kosong, bukan error
+    cube = buat_cube(buat_data_sintetis(n_baris=500, seed=19)[['Instansi', 'Topik', 'Channel', 'Status']])
+    muat = Snapshot.dari_bytes(Snapshot.dari_cube(cube).ke_bytes())
+    pd.testing.assert_frame_equal(muat.rkm, rekap_cube(cube)[0], check_dtype=False)
+    assert not muat.indeks.ada_data
+    assert not muat.grafik.tabel
+
+def tulis_arsip(manifest, file=None):
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w') as arsip:
+        arsip.writestr('manifest.json', json.dumps(manifest))
+        for nama, isi in (file or {}).items():
+            arsip.writestr(nama, isi)
+    return output.getvalue()
+
+@pytest.mark.parametrize('isi_file', [
+    b'bukan zip',
+    tulis_arsip({'format': 'lain'}),
+    # Manifest valid tetapi tabel rekap dan indeks tidak ada
+    tulis_arsip({'format': 'auto-rkm-snapshot', 'versi': 1, 'tabel': {}}),
+    tulis_arsip({'format': 'auto-rkm-snapshot', 'versi': 1}),
+])
+def test_snapshot_tidak_valid_menjadi_valueerror(isi_file):
+    with pytest.raises(ValueError):
+        Snapshot.dari_bytes(isi_file)